@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tasks"))
+
+from todolist import Priority, Status, TodoList  # noqa: E402
+
+WORDS: list[str] = [
+    "купить",
+    "заплатить",
+    "позвонить",
+    "починить",
+    "отчёт",
+    "квартира",
+    "розетка",
+    "продукты",
+    "уроки",
+    "будильник",
+]
+
+
+def make_todo_list(count: int) -> TodoList:
+    rng: random.Random = random.Random(42)
+    todo_list: TodoList = TodoList()
+    for _ in range(count):
+        text: str = " ".join(rng.choices(WORDS, k=3)).capitalize()
+        priority: Priority = rng.choice(list(Priority))
+        status: Status = rng.choice(list(Status))
+        todo_list.add(text, priority.name, status.name)
+    return todo_list
+
+
+def best_of(repeat: int, func) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Сравнение размера и скорости сжатых хранилищ задач"
+    )
+    parser.add_argument("-n", type=int, default=100_000, help="Количество задач")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Повторов")
+    args: argparse.Namespace = parser.parse_args()
+
+    todo_list: TodoList = make_todo_list(args.n)
+
+    print(f"Задач: {args.n}")
+    line: str = f"+-{'-' * 14}-+-{'-' * 12}-+-{'-' * 8}-+-{'-' * 10}-+-{'-' * 10}-+"
+    print(line)
+    print(
+        f"| {'Файл':^14} | {'Размер, КБ':^12} | {'Сжатие':^8} | "
+        f"{'Запись, с':^10} | {'Чтение, с':^10} |"
+    )
+    print(line)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plain_size: int = 0
+        # The store cache would hide the parsing and decompression cost.
+        TodoList.STORE_CACHE = False
+        for suffix in ("", ".gz", ".bz2", ".xz"):
+            filename: str = os.path.join(tmpdir, "tasks.xml" + suffix)
+
+            save_time: float = best_of(args.repeat, lambda: todo_list.save(filename))
+            load_time: float = best_of(args.repeat, lambda: TodoList().load(filename))
+
+            size: int = os.path.getsize(filename)
+            plain_size = plain_size or size
+            print(
+                f"| {'tasks.xml' + suffix:<14} | {size / 1024:>12.1f} | "
+                f"{plain_size / size:>8.1f} | {save_time:>10.3f} | {load_time:>10.3f} |"
+            )
+
+        # A session store: loaded once, then saved back with its cache.
+        TodoList.STORE_CACHE = True
+        filename = os.path.join(tmpdir, "tasks.xml")
+        store: TodoList = TodoList()
+        store.load(filename)
+        save_time = best_of(args.repeat, lambda: store.save(filename))
+        load_time = best_of(args.repeat, lambda: TodoList().load(filename))
+
+        size = os.path.getsize(filename + ".cache")
+        print(
+            f"| {'кэш tasks.xml':<14} | {size / 1024:>12.1f} | "
+            f"{plain_size / size:>8.1f} | {save_time:>10.3f} | {load_time:>10.3f} |"
+        )
+
+    print(line)
+
+
+if __name__ == "__main__":
+    main()
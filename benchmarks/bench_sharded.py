@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tasks"))
+
+from sharded import ShardedTodoList  # noqa: E402
+from todolist import Priority, Status, Task, TodoList  # noqa: E402
+
+
+def make_tasks(count: int) -> list[Task]:
+    rng: random.Random = random.Random(42)
+    priorities: list[Priority] = list(Priority)
+    statuses: list[Status] = list(Status)
+    return [
+        Task(
+            text=f"Задача {idx}",
+            priority=rng.choice(priorities),
+            status=rng.choice(statuses),
+        )
+        for idx in range(count)
+    ]
+
+
+def best_of(repeat: int, func) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Масштабирование фильтрации ShardedTodoList по процессам"
+    )
+    parser.add_argument("-n", type=int, default=1_000_000, help="Количество задач")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Повторов")
+    args: argparse.Namespace = parser.parse_args()
+
+    tasks: list[Task] = make_tasks(args.n)
+    todo_list: TodoList = TodoList(tasks)
+
+    line: str = f"+-{'-' * 10}-+-{'-' * 12}-+-{'-' * 12}-+-{'-' * 12}-+"
+    print(f"Задач: {args.n}")
+    print(line)
+    print(
+        f"| {'Процессы':^10} | {'select, с':^12} | {'stats, с':^12} | "
+        f"{'search, с':^12} |"
+    )
+    print(line)
+
+    select_time: float = best_of(
+        args.repeat, lambda: todo_list._select_status(Status.NEW)
+    )
+    search_time: float = best_of(args.repeat, lambda: todo_list._search(("задача",)))
+    print(
+        f"| {'TodoList':<10} | {select_time:>12.3f} | {'-':>12} | "
+        f"{search_time:>12.3f} |"
+    )
+
+    workers: int = 1
+    while workers <= (os.cpu_count() or 1):
+        with ShardedTodoList(tasks, workers=workers) as sharded:
+            sharded.stats()
+            sharded._search(("задача",))
+
+            select_time = best_of(
+                args.repeat, lambda: sharded._select_status(Status.NEW)
+            )
+            stats_time: float = best_of(args.repeat, sharded.stats)
+            search_time = best_of(args.repeat, lambda: sharded._search(("задача",)))
+
+        print(
+            f"| {workers:>10} | {select_time:>12.3f} | {stats_time:>12.3f} | "
+            f"{search_time:>12.3f} |"
+        )
+        workers *= 2
+
+    print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tasks"))
+
+from todolist import Priority, Status, Task, TodoList  # noqa: E402
+
+
+def make_todo_list(count: int) -> TodoList:
+    rng: random.Random = random.Random(42)
+    return TodoList(
+        [
+            Task(
+                text=f"Задача {idx}",
+                priority=rng.choice(list(Priority)),
+                status=rng.choice(list(Status)),
+            )
+            for idx in range(count)
+        ]
+    )
+
+
+def scan(todo_list: TodoList) -> None:
+    todo_list.top(5, where=lambda task: task.status == Status.NEW)
+    todo_list.select_by_status("new")
+    todo_list.stats()
+
+
+# Cache hits and stats do almost no work, so they measure the locking itself.
+def lookup(todo_list: TodoList) -> None:
+    todo_list.select_by_status("new")
+    todo_list.search("задача")
+    todo_list.stats()
+
+
+def read_throughput(
+    todo_list: TodoList, work: Callable[[TodoList], None], threads: int, ops: int
+) -> float:
+    barrier: threading.Barrier = threading.Barrier(threads + 1)
+
+    def reader() -> None:
+        barrier.wait()
+        for _ in range(ops):
+            work(todo_list)
+
+    workers: list[threading.Thread] = [
+        threading.Thread(target=reader) for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start: float = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Пропускная способность чтения TodoList из нескольких потоков"
+    )
+    parser.add_argument("-n", type=int, default=10_000, help="Количество задач")
+    parser.add_argument("--ops", type=int, default=50, help="Операций на поток")
+    parser.add_argument(
+        "--lookups", type=int, default=20_000, help="Обращений к кэшу на поток"
+    )
+    parser.add_argument("--max-threads", type=int, default=8, help="Максимум потоков")
+    args: argparse.Namespace = parser.parse_args()
+
+    gil: bool = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Задач: {args.n}, GIL: {'включён' if gil else 'отключён'}")
+
+    todo_list: TodoList = make_todo_list(args.n)
+    line: str = f"+-{'-' * 8}-+" + f"-{'-' * 14}-+-{'-' * 10}-+" * 2
+    print(line)
+    print(
+        f"| {'Потоки':^8} | {'Просмотр, оп/с':^14} | {'Ускорение':^10} | "
+        f"{'Кэш, оп/с':^14} | {'Ускорение':^10} |"
+    )
+    print(line)
+
+    baseline: float = 0.0
+    cached_baseline: float = 0.0
+    threads: int = 1
+    while threads <= args.max_threads:
+        throughput: float = read_throughput(todo_list, scan, threads, args.ops)
+        cached: float = read_throughput(todo_list, lookup, threads, args.lookups)
+        baseline = baseline or throughput
+        cached_baseline = cached_baseline or cached
+        print(
+            f"| {threads:>8} | {throughput:>14.1f} | {throughput / baseline:>10.2f} | "
+            f"{cached:>14.1f} | {cached / cached_baseline:>10.2f} |"
+        )
+        threads *= 2
+
+    print(line)
+
+
+if __name__ == "__main__":
+    main()
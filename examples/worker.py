@@ -2,9 +2,21 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import csv
+import json
+import os
+import sys
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass, field
 from datetime import date
+from typing import Any, Iterable, Iterator, TextIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tasks"))
+
+from stores import FORMATS, open_store  # noqa: E402
+
+WORKER_FIELDS: tuple[str, ...] = ("name", "post", "year")
+STAFF_FILE: str = "staff.xml"
 
 
 @dataclass(frozen=True)
@@ -14,6 +26,95 @@ class Worker:
     year: int
 
 
+def worker_record(worker: Worker) -> dict[str, str | int]:
+    return {"name": worker.name, "post": worker.post, "year": worker.year}
+
+
+def worker_from_record(record: dict) -> Worker:
+    try:
+        name: Any = record["name"]
+        post: Any = record["post"]
+        if not isinstance(name, str) or not isinstance(post, str):
+            raise TypeError("name and post must be strings")
+        return Worker(name=name, post=post, year=int(record["year"]))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid worker record: {record}")
+
+
+def iter_workers(fin: TextIO, fmt: str = "xml") -> Iterator[Worker]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format: {fmt}")
+
+    if fmt == "jsonl":
+        for line in fin:
+            if line.strip():
+                yield worker_from_record(json.loads(line))
+        return
+
+    if fmt == "csv":
+        for row in csv.DictReader(fin):
+            yield worker_from_record(row)
+        return
+
+    for _, worker_element in ET.iterparse(fin):
+        if worker_element.tag != "worker":
+            continue
+
+        name: str | None = None
+        post: str | None = None
+        year: int | None = None
+
+        for element in worker_element:
+            if element.tag == "name":
+                name = element.text
+            elif element.tag == "post":
+                post = element.text
+            elif element.tag == "year":
+                if element.text is not None:
+                    year = int(element.text)
+
+        if name is not None and post is not None and year is not None:
+            yield Worker(name=name, post=post, year=year)
+        worker_element.clear()
+
+
+def dump_workers(workers: Iterable[Worker], fout: TextIO, fmt: str = "xml") -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format: {fmt}")
+
+    if fmt == "jsonl":
+        for worker in workers:
+            fout.write(json.dumps(worker_record(worker), ensure_ascii=False) + "\n")
+        return
+
+    if fmt == "csv":
+        writer: csv.DictWriter = csv.DictWriter(fout, fieldnames=WORKER_FIELDS)
+        writer.writeheader()
+        for worker in workers:
+            writer.writerow(worker_record(worker))
+        return
+
+    root: ET.Element = ET.Element("workers")
+
+    for worker in workers:
+        worker_element: ET.Element = ET.Element("worker")
+
+        name_element: ET.Element = ET.SubElement(worker_element, "name")
+        name_element.text = worker.name
+
+        post_element: ET.Element = ET.SubElement(worker_element, "post")
+        post_element.text = worker.post
+
+        year_element: ET.Element = ET.SubElement(worker_element, "year")
+        year_element.text = str(worker.year)
+
+        root.append(worker_element)
+
+    tree: ET.ElementTree = ET.ElementTree(root)
+    fout.write("<?xml version='1.0' encoding='utf-8'?>\n")
+    tree.write(fout, encoding="unicode")
+
+
 @dataclass
 class Staff:
     workers: list[Worker] = field(default_factory=list)
@@ -47,51 +148,27 @@ class Staff:
 
         return result
 
-    def load(self, filename: str) -> None:
-        with open(filename, "r", encoding="utf-8") as fin:
-            xml: str = fin.read()
-
-        parser: ET.XMLParser = ET.XMLParser(encoding="utf-8")
-        tree: ET.Element = ET.fromstring(xml, parser=parser)
-
-        self.workers = []
-        for worker_element in tree:
-            name: str | None = None
-            post: str | None = None
-            year: int | None = None
-
-            for element in worker_element:
-                if element.tag == "name":
-                    name = element.text
-                elif element.tag == "post":
-                    post = element.text
-                elif element.tag == "year":
-                    if element.text is not None:
-                        year = int(element.text)
-
-            if name is not None and post is not None and year is not None:
-                self.workers.append(Worker(name=name, post=post, year=year))
-
-    def save(self, filename: str) -> None:
-        root: ET.Element = ET.Element("workers")
+    def read(self, fin: TextIO, fmt: str = "xml") -> None:
+        self.workers = list(iter_workers(fin, fmt))
 
-        for worker in self.workers:
-            worker_element: ET.Element = ET.Element("worker")
-
-            name_element: ET.Element = ET.SubElement(worker_element, "name")
-            name_element.text = worker.name
+    def write(self, fout: TextIO, fmt: str = "xml") -> None:
+        dump_workers(self.workers, fout, fmt)
 
-            post_element: ET.Element = ET.SubElement(worker_element, "post")
-            post_element.text = worker.post
+    def load(self, filename: str, fmt: str = "xml") -> None:
+        if filename == "-":
+            self.read(sys.stdin, fmt)
+            return
 
-            year_element: ET.Element = ET.SubElement(worker_element, "year")
-            year_element.text = str(worker.year)
+        with open_store(filename) as fin:
+            self.read(fin, fmt)
 
-            root.append(worker_element)
+    def save(self, filename: str, fmt: str = "xml") -> None:
+        if filename == "-":
+            self.write(sys.stdout, fmt)
+            return
 
-        tree: ET.ElementTree = ET.ElementTree(root)
-        with open(filename, "wb") as fout:
-            tree.write(fout, encoding="utf-8", xml_declaration=True)
+        with open_store(filename, "w") as fout:
+            self.write(fout, fmt)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -116,26 +193,63 @@ def build_parser() -> argparse.ArgumentParser:
     select_parser.add_argument("--period", required=True, type=int, help="Стаж (годы)")
 
     load_parser: argparse.ArgumentParser = subparsers.add_parser(
-        "load", help="Загрузить из XML"
+        "load", help="Загрузить из файла"
+    )
+    load_parser.add_argument("filename", help="Имя файла или - для stdin")
+    load_parser.add_argument(
+        "--format", choices=FORMATS, default="xml", help="Формат файла"
     )
-    load_parser.add_argument("filename", help="Имя XML файла")
 
     save_parser: argparse.ArgumentParser = subparsers.add_parser(
-        "save", help="Сохранить в XML"
+        "save", help="Сохранить в файл"
+    )
+    save_parser.add_argument("filename", help="Имя файла или - для stdout")
+    save_parser.add_argument(
+        "--format", choices=FORMATS, default="xml", help="Формат файла"
     )
-    save_parser.add_argument("filename", help="Имя XML файла")
 
     return parser
 
 
-def main() -> None:
-    staff: Staff = Staff()
+def print_selected(staff: Staff, period: int) -> None:
+    selected: list[Worker] = staff.select(period)
+    if selected:
+        print(f"\nСотрудники со стажем >= {period} лет:")
+        for idx, worker in enumerate(selected, 1):
+            print(f"{idx:>4}: {worker.name} - {worker.post} ({worker.year})")
+    else:
+        print("Работники с заданным стажем не найдены.")
+
 
-    import os
+def run_command(staff: Staff, args: argparse.Namespace) -> None:
+    if args.command == "add":
+        staff.add(args.name, args.post, args.year)
+        staff.save(STAFF_FILE)
+        print("✓ Сотрудник добавлен.")
 
-    if os.path.exists("staff.xml"):
-        staff.load("staff.xml")
+    elif args.command == "list":
+        print(staff)
 
+    elif args.command == "select":
+        print_selected(staff, args.period)
+
+    elif args.command == "load":
+        staff.load(args.filename, args.format)
+        staff.save(STAFF_FILE)
+        print(
+            f"✓ Данные загружены из {args.filename}",
+            file=sys.stderr if args.filename == "-" else sys.stdout,
+        )
+
+    elif args.command == "save":
+        staff.save(args.filename, args.format)
+        if args.filename != "-":
+            print(f"✓ Данные сохранены в {args.filename}")
+
+
+# Prompts and commands share stdin and stdout, so "-" is only accepted by
+# the one-shot commands: worker.py load - / worker.py save -.
+def interact(staff: Staff) -> None:
     print("Система учёта сотрудников")
     print("Команды: add, list, select, load, save, exit")
     print()
@@ -153,33 +267,26 @@ def main() -> None:
                 post: str = input("Должность: ").strip()
                 year: int = int(input("Год поступления: ").strip())
                 staff.add(name, post, year)
-                staff.save("staff.xml")
+                staff.save(STAFF_FILE)
                 print("✓ Сотрудник добавлен.")
 
             elif command == "list":
                 print(staff)
 
             elif command == "select":
-                period: int = int(input("Стаж (годы): ").strip())
-                selected: list[Worker] = staff.select(period)
-                if selected:
-                    print(f"\nСотрудники со стажем >= {period} лет:")
-                    for idx, worker in enumerate(selected, 1):
-                        print(
-                            f"{idx:>4}: {worker.name} - {worker.post} ({worker.year})"
-                        )
+                print_selected(staff, int(input("Стаж (годы): ").strip()))
+
+            elif command in ("load", "save"):
+                filename: str = input("Имя файла: ").strip()
+                fmt: str = input("Формат (xml/jsonl/csv) [xml]: ").strip() or "xml"
+                if filename == "-":
+                    print(f"Ошибка: для stdin/stdout запустите worker.py {command} -")
+                elif command == "load":
+                    staff.load(filename, fmt)
+                    print(f"✓ Данные загружены из {filename}")
                 else:
-                    print("Работники с заданным стажем не найдены.")
-
-            elif command == "load":
-                load_filename: str = input("Имя XML файла: ").strip()
-                staff.load(load_filename)
-                print(f"✓ Данные загружены из {load_filename}")
-
-            elif command == "save":
-                filename: str = input("Имя XML файла: ").strip()
-                staff.save(filename)
-                print(f"✓ Данные сохранены в {filename}")
+                    staff.save(filename, fmt)
+                    print(f"✓ Данные сохранены в {filename}")
 
             else:
                 msg: str = "Неизвестная команда. Доступные команды: "
@@ -188,6 +295,9 @@ def main() -> None:
 
             print()
 
+        except EOFError:
+            print()
+            break
         except ValueError:
             print("Ошибка: неверное значение. Попробуйте снова.")
             print()
@@ -196,5 +306,22 @@ def main() -> None:
             print()
 
 
+def main(argv: list[str] | None = None) -> None:
+    parser: argparse.ArgumentParser = build_parser()
+    args: argparse.Namespace = parser.parse_args(argv)
+    staff: Staff = Staff()
+
+    try:
+        if os.path.exists(STAFF_FILE):
+            staff.load(STAFF_FILE)
+
+        if args.command is None:
+            interact(staff)
+        else:
+            run_command(staff, args)
+    except (OSError, ValueError, ET.ParseError) as e:
+        parser.exit(1, f"Ошибка: {e}\n")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import accumulate, chain, compress, islice
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+from multiprocessing.pool import AsyncResult, Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterator
+
+from todolist import (
+    BLOCK_SIZE,
+    Priority,
+    Status,
+    Task,
+    TodoList,
+    TokenIndex,
+    build_stats,
+)
+
+PRIORITIES: list[Priority] = list(Priority)
+STATUSES: list[Status] = list(Status)
+CODES: int = len(PRIORITIES) * len(STATUSES)
+# Code of a deleted slot; it matches no status or priority.
+DELETED: int = 255
+COLUMNS: tuple[str, ...] = ("codes", "texts", "offsets", "mask")
+OFFSET_SIZE: int = array("q").itemsize
+
+# Segments attached inside a worker process, by shared memory name.
+_attached: dict[str, SharedMemory] = {}
+# Token index of the worker's shard and how many slots it covers, by layout.
+_indexes: dict[int, tuple[TokenIndex, int]] = {}
+
+
+def task_code(task: Task) -> int:
+    return PRIORITIES.index(task.priority) * len(STATUSES) + STATUSES.index(task.status)
+
+
+def slot_code(task: Task | None) -> int:
+    return DELETED if task is None else task_code(task)
+
+
+def _attach(names: tuple[str, ...]) -> list[SharedMemory]:
+    for name in list(_attached):
+        if name not in names:
+            _attached.pop(name).close()
+
+    for name in names:
+        if name not in _attached:
+            _attached[name] = SharedMemory(name=name, track=False)
+    return [_attached[name] for name in names]
+
+
+def _count_shard(names: tuple[str, ...], ranges: list[tuple[int, int]]) -> list[int]:
+    codes, _, _, _ = _attach(names)
+    buf: memoryview | None = codes.buf
+    assert buf is not None
+    chunk: bytes = b"".join(bytes(buf[start:stop]) for start, stop in ranges)
+    return [chunk.count(code) for code in range(CODES)]
+
+
+# A query marks the slots it matches in the shared mask column, one byte per
+# slot, and only the number of matches per range goes back to the parent.
+def _write_mask(mask: SharedMemory, start: int, chunk: bytes | bytearray) -> int:
+    buf: memoryview | None = mask.buf
+    assert buf is not None
+    stop: int = start + len(chunk)
+    buf[start:stop] = chunk
+    return chunk.count(1)
+
+
+def _select_shard(
+    names: tuple[str, ...], ranges: list[tuple[int, int]], table: bytes
+) -> list[int]:
+    codes, _, _, mask = _attach(names)
+    buf: memoryview | None = codes.buf
+    assert buf is not None
+    return [
+        _write_mask(mask, start, bytes(buf[start:stop]).translate(table))
+        for start, stop in ranges
+    ]
+
+
+# A worker serves a single shard, so it keeps one index and extends it with
+# the slots appended since the previous call.
+def _search_shard(
+    names: tuple[str, ...],
+    ranges: list[tuple[int, int]],
+    layout: int,
+    terms: tuple[str, ...],
+) -> list[int]:
+    _, texts, offsets_shm, mask = _attach(names)
+    texts_buf: memoryview | None = texts.buf
+    offsets_buf: memoryview | None = offsets_shm.buf
+    assert texts_buf is not None and offsets_buf is not None
+
+    index, done = _indexes.get(layout, (TokenIndex(), 0))
+    for start, stop in ranges:
+        start = max(start, done)
+        if start >= stop:
+            continue
+
+        offsets: array = array("q")
+        low: int = OFFSET_SIZE * start
+        high: int = OFFSET_SIZE * (stop + 1)
+        offsets.frombytes(bytes(offsets_buf[low:high]))
+        index.extend(
+            (pos, bytes(texts_buf[begin:end]).decode())
+            for pos, begin, end in zip(range(start, stop), offsets, offsets[1:])
+        )
+
+    done = max(done, ranges[-1][1])
+    _indexes.clear()
+    _indexes[layout] = (index, done)
+
+    found: list[int] = index.search(terms, done)
+    counts: list[int] = []
+    for start, stop in ranges:
+        chunk: bytearray = bytearray(stop - start)
+        first: int = bisect_left(found, start)
+        last: int = bisect_left(found, stop)
+        for pos in found[first:last]:
+            chunk[pos - start] = 1
+        counts.append(_write_mask(mask, start, chunk))
+    return counts
+
+
+# Slots are dealt to shards in stripes of `stripe` slots, round robin, and
+# every shard has a single-process pool of its own: a worker only ever indexes
+# its own shard, and appended slots extend the last stripe only.
+@dataclass(eq=False, repr=False)
+class ShardedTodoList(TodoList):
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    stripe: int = 1 << 16
+    _pools: list[Pool] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _segments: dict[str, SharedMemory] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Columns hold slots [0, _synced) of layout _synced_layout; _touched are
+    # the slots written since.
+    _synced: int = field(default=0, init=False, repr=False, compare=False)
+    _synced_layout: int = field(default=-1, init=False, repr=False, compare=False)
+    _text_size: int = field(default=0, init=False, repr=False, compare=False)
+    _touched: set[int] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+    _pool_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    # Queries share the mask column, so they take turns.
+    _mask_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __enter__(self) -> "ShardedTodoList":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            for pool in self._pools:
+                pool.terminate()
+                pool.join()
+            self._pools = []
+            self._release()
+
+    def _release(self) -> None:
+        for shm in self._segments.values():
+            shm.close()
+            shm.unlink()
+        self._segments = {}
+        self._synced = 0
+        self._synced_layout = -1
+        self._text_size = 0
+
+    def _set_slot(self, pos: int, task: Task | None) -> None:
+        super()._set_slot(pos, task)
+        self._touched.add(pos)
+
+    # Segments grow by doubling; the first `used` bytes are carried over.
+    def _reserve(self, name: str, used: int, size: int) -> memoryview:
+        shm: SharedMemory | None = self._segments.get(name)
+        if shm is None or shm.size < size:
+            grown: SharedMemory = SharedMemory(
+                create=True, size=max(size, 2 * (shm.size if shm else 0), 1)
+            )
+            if shm is not None:
+                grown_buf: memoryview | None = grown.buf
+                old_buf: memoryview | None = shm.buf
+                assert grown_buf is not None and old_buf is not None
+                grown_buf[:used] = old_buf[:used]
+                shm.close()
+                shm.unlink()
+            self._segments[name] = shm = grown
+
+        buf: memoryview | None = shm.buf
+        assert buf is not None
+        return buf
+
+    def _columns(self) -> tuple[str, ...]:
+        with self._pool_lock:
+            return self._build_columns()
+
+    # Only the slots touched since the last call are encoded: appended slots
+    # are written past the end of the columns and rewritten slots only get a
+    # new code, since their text never changes. Moving tasks to new
+    # positions (sort, compaction, load) rebuilds the columns.
+    def _build_columns(self) -> tuple[str, ...]:
+        if self._synced_layout != self._layout:
+            self._release()
+            # Offsets start with the zero offset of the first slot.
+            self._reserve("codes", 0, 0)
+            self._reserve("texts", 0, 0)
+            self._reserve("offsets", 0, OFFSET_SIZE)
+            self._touched.clear()
+            self._synced_layout = self._layout
+
+        synced: int = self._synced
+        size: int = self._size
+        if synced < size:
+            added: list[Task | None] = [self._slot(pos) for pos in range(synced, size)]
+            texts: list[bytes] = [
+                b"" if task is None else task.text.encode() for task in added
+            ]
+            offsets: array = array(
+                "q", accumulate(map(len, texts), initial=self._text_size)
+            )
+            text_start: int = offsets.pop(0)
+            text_size: int = offsets[-1]
+
+            codes_buf: memoryview = self._reserve("codes", synced, size)
+            codes_buf[synced:size] = bytes(map(slot_code, added))
+
+            texts_buf: memoryview = self._reserve("texts", text_start, text_size)
+            texts_buf[text_start:text_size] = b"".join(texts)
+
+            low: int = OFFSET_SIZE * (synced + 1)
+            high: int = OFFSET_SIZE * (size + 1)
+            offsets_buf: memoryview = self._reserve("offsets", low, high)
+            offsets_buf[low:high] = offsets.tobytes()
+
+            self._synced = size
+            self._text_size = text_size
+
+        if self._touched:
+            codes_buf = self._reserve("codes", size, size)
+            for pos in self._touched:
+                codes_buf[pos] = slot_code(self._slot(pos))
+            self._touched.clear()
+
+        self._reserve("mask", 0, size)
+        return tuple(self._segments[name].name for name in COLUMNS)
+
+    def _shards(self) -> list[tuple[int, list[tuple[int, int]]]]:
+        size: int = self._synced
+        step: int = self.stripe * self.workers
+        shards: list[tuple[int, list[tuple[int, int]]]] = []
+        for shard in range(min(self.workers, -(-size // self.stripe))):
+            shards.append(
+                (
+                    shard,
+                    [
+                        (start, min(start + self.stripe, size))
+                        for start in range(self.stripe * shard, size, step)
+                    ],
+                )
+            )
+        return shards
+
+    def _map(self, func: Any, jobs: list[tuple[int, tuple]]) -> list[Any]:
+        with self._pool_lock:
+            if not self._pools:
+                # Each pool starts threads, so later pools must not fork.
+                context: BaseContext = get_context("forkserver")
+                self._pools = [context.Pool(1) for _ in range(self.workers)]
+            pools: list[Pool] = self._pools
+        results: list[AsyncResult] = [
+            pools[shard].apply_async(func, args) for shard, args in jobs
+        ]
+        return [result.get() for result in results]
+
+    # Ranges tile the slots in order, so compressing the slots of every range
+    # with a match, by start, yields the tasks in order; ranges without a
+    # match are skipped.
+    def _query(self, func: Any, *args: Any) -> tuple[Task, ...]:
+        with self._mask_lock:
+            names: tuple[str, ...] = self._columns()
+            shards: list[tuple[int, list[tuple[int, int]]]] = self._shards()
+            counts: list[list[int]] = self._map(
+                func, [(shard, (names, ranges, *args)) for shard, ranges in shards]
+            )
+            spans: list[tuple[int, int]] = sorted(
+                span
+                for (_, ranges), shard_counts in zip(shards, counts)
+                for span, count in zip(ranges, shard_counts)
+                if count
+            )
+
+            buf: memoryview | None = self._segments["mask"].buf
+            assert buf is not None
+            tasks: list[Task] = []
+            for start, stop in spans:
+                block, offset = divmod(start, BLOCK_SIZE)
+                slots: Iterator[Task | None] = islice(
+                    chain.from_iterable(islice(self._blocks, block, None)), offset, None
+                )
+                tasks.extend(filter(None, compress(slots, bytes(buf[start:stop]))))
+            return tuple(tasks)
+
+    def _select_codes(self, codes: set[int]) -> tuple[Task, ...]:
+        if not self._count():
+            return ()
+
+        table: bytes = bytes(1 if code in codes else 0 for code in range(256))
+        return self._query(_select_shard, table)
+
+    def _select_status(self, st: Status) -> tuple[Task, ...]:
+        offset: int = STATUSES.index(st)
+        return self._select_codes(
+            {idx * len(STATUSES) + offset for idx in range(len(PRIORITIES))}
+        )
+
+    def _select_priority(self, pri: Priority) -> tuple[Task, ...]:
+        offset: int = PRIORITIES.index(pri) * len(STATUSES)
+        return self._select_codes({offset + idx for idx in range(len(STATUSES))})
+
+    def _search(self, terms: tuple[str, ...]) -> tuple[Task, ...]:
+        if not self._count():
+            return ()
+
+        return self._query(_search_shard, self._layout, terms)
+
+    def stats(self) -> dict:
+        with self._lock.read():
+            return build_stats(self._count_shards())
+
+    def _count_shards(self) -> Counter[tuple[Priority, Status]]:
+        counts: Counter[tuple[Priority, Status]] = Counter()
+        if self._count():
+            names: tuple[str, ...] = self._columns()
+            for shard in self._map(
+                _count_shard,
+                [(shard, (names, ranges)) for shard, ranges in self._shards()],
+            ):
+                for code, count in enumerate(shard):
+                    pri: Priority = PRIORITIES[code // len(STATUSES)]
+                    st: Status = STATUSES[code % len(STATUSES)]
+                    counts[pri, st] += count
+
+        return counts
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bz2
+import gzip
+import lzma
+import os
+from typing import Any, Callable, TextIO
+
+FORMATS: tuple[str, ...] = ("xml", "jsonl", "csv")
+COMPRESSORS: dict[str, Callable[..., Any]] = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+}
+
+
+def open_store(filename: str, mode: str = "r") -> TextIO:
+    opener: Callable[..., Any] = COMPRESSORS.get(
+        os.path.splitext(filename)[1].lower(), open
+    )
+    return opener(filename, mode + "t", encoding="utf-8", newline="")
@@ -3,7 +3,7 @@
 
 import os
 
-from todolist import Task, TodoList
+from todolist import Task, TodoList, format_stats
 
 
 def main() -> None:
@@ -16,7 +16,10 @@ def main() -> None:
             print(f"Ошибка при загрузке: {e}")
 
     print("Система управления списком задач (TODO)")
-    print("Команды: add, list, select, sort, load, save, exit")
+    print(
+        "Команды: add, list, select, search, stats, update, delete, sort, "
+        "load, save, exit"
+    )
     print()
 
     while True:
@@ -35,9 +38,9 @@ def main() -> None:
                     or "new"
                 )
 
-                todo_list.add(text, priority, status)
+                task_id: int = todo_list.add(text, priority, status)
                 todo_list.save("tasks.xml")
-                print("Задача добавлена.\n")
+                print(f"Задача {task_id} добавлена.\n")
 
             elif command == "list":
                 print(todo_list)
@@ -52,7 +55,9 @@ def main() -> None:
                     select_status: str = (
                         input("Статус (new/in_progress/completed): ").strip().lower()
                     )
-                    selected: list[Task] = todo_list.select_by_status(select_status)
+                    selected: tuple[Task, ...] = todo_list.select_by_status(
+                        select_status
+                    )
                 elif filter_type == "priority":
                     select_priority: str = (
                         input("Приоритет (low/medium/high): ").strip().lower()
@@ -64,14 +69,47 @@ def main() -> None:
 
                 if selected:
                     print(f"\nНайдено задач: {len(selected)}\n")
-                    for idx, task in enumerate(selected, 1):
+                    for task in selected:
                         status_str: str = str(task.status)
                         priority_str: str = str(task.priority)
-                        print(f"{idx}. {task.text} " f"[{priority_str}, {status_str}]")
+                        print(f"{task.id}. {task.text} [{priority_str}, {status_str}]")
                 else:
                     print("Задачи не найдены.")
                 print()
 
+            elif command == "search":
+                query: str = input("Запрос: ").strip()
+                found: tuple[Task, ...] = todo_list.search(query)
+
+                if found:
+                    print(f"\nНайдено задач: {len(found)}\n")
+                    for task in found:
+                        print(
+                            f"{task.id}. {task.text} [{task.priority}, {task.status}]"
+                        )
+                else:
+                    print("Задачи не найдены.")
+                print()
+
+            elif command == "stats":
+                print(format_stats(todo_list.stats()))
+                print()
+
+            elif command == "update":
+                update_id: int = int(input("Номер задачи: ").strip())
+                new_status: str = (
+                    input("Статус (new/in_progress/completed): ").strip().lower()
+                )
+                todo_list.update_status(update_id, new_status)
+                todo_list.save("tasks.xml")
+                print("Статус задачи изменён.\n")
+
+            elif command == "delete":
+                delete_id: int = int(input("Номер задачи: ").strip())
+                todo_list.delete(delete_id)
+                todo_list.save("tasks.xml")
+                print("Задача удалена.\n")
+
             elif command == "sort":
                 todo_list.sort_by_priority()
                 todo_list.save("tasks.xml")
@@ -93,7 +131,7 @@ def main() -> None:
                 print(
                     "Неизвестная команда. "
                     "Доступные команды: add, list, select, "
-                    "sort, load, save, exit\n"
+                    "search, stats, update, delete, sort, load, save, exit\n"
                 )
 
         except ValueError as e:
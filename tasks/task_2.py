@@ -1,15 +1,58 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import json
 import os
+import sys
+from dataclasses import dataclass
 
 import click
-from todolist import Task, TodoList
+from todolist import FORMATS, SORT_KEYS, Status, Task, TodoList, format_stats
 
 
-@click.group()
-def cli() -> None:
-    pass
+@dataclass
+class Session:
+    filename: str | None = "tasks.xml"
+    fmt: str = "xml"
+    todo_list: TodoList | None = None
+    changed: bool = False
+
+
+def get_todo_list(session: Session) -> TodoList | None:
+    if session.todo_list is None:
+        todo_list: TodoList = TodoList()
+        if session.filename and os.path.exists(session.filename):
+            try:
+                todo_list.load(session.filename, session.fmt)
+            except Exception as e:
+                click.echo(f"Ошибка при загрузке: {e}", err=True)
+                return None
+        session.todo_list = todo_list
+
+    return session.todo_list
+
+
+def flush(session: Session) -> None:
+    if not session.changed or session.todo_list is None or not session.filename:
+        return
+
+    try:
+        session.todo_list.save(session.filename, session.fmt)
+        session.changed = False
+    except Exception as e:
+        click.echo(f"Ошибка: {e}", err=True)
+
+
+@click.group(chain=True)
+@click.pass_context
+def cli(ctx: click.Context) -> None:
+    ctx.obj = Session()
+
+
+@cli.result_callback()
+@click.pass_obj
+def finish(session: Session, results: list[None]) -> None:
+    flush(session)
 
 
 @cli.command()
@@ -27,31 +70,26 @@ def cli() -> None:
     default="new",
     help="Статус",
 )
-def add(text: str, priority: str, status: str) -> None:
-    todo_list: TodoList = TodoList()
-    if os.path.exists("tasks.xml"):
-        try:
-            todo_list.load("tasks.xml")
-        except Exception as e:
-            click.echo(f"Ошибка при загрузке: {e}", err=True)
+@click.pass_obj
+def add(session: Session, text: str, priority: str, status: str) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
 
     try:
-        todo_list.add(text, priority, status)
-        todo_list.save("tasks.xml")
-        click.echo("Задача добавлена.")
+        task_id: int = todo_list.add(text, priority, status)
+        session.changed = True
+        click.echo(f"Задача {task_id} добавлена.")
     except ValueError as e:
         click.echo(f"Ошибка: {e}", err=True)
 
 
 @cli.command(name="list")
-def list_tasks() -> None:
-    todo_list: TodoList = TodoList()
-    if os.path.exists("tasks.xml"):
-        try:
-            todo_list.load("tasks.xml")
-        except Exception as e:
-            click.echo(f"Ошибка при загрузке: {e}", err=True)
-            return
+@click.pass_obj
+def list_tasks(session: Session) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
 
     click.echo(todo_list)
 
@@ -67,7 +105,8 @@ def list_tasks() -> None:
     type=click.Choice(["low", "medium", "high"]),
     help="Фильтр по приоритету",
 )
-def select(status: str | None, priority: str | None) -> None:
+@click.pass_obj
+def select(session: Session, status: str | None, priority: str | None) -> None:
     if not status and not priority:
         click.echo("Укажите --status или --priority", err=True)
         return
@@ -76,17 +115,13 @@ def select(status: str | None, priority: str | None) -> None:
         click.echo("Укажите только --status или только --priority", err=True)
         return
 
-    todo_list: TodoList = TodoList()
-    if os.path.exists("tasks.xml"):
-        try:
-            todo_list.load("tasks.xml")
-        except Exception as e:
-            click.echo(f"Ошибка при загрузке: {e}", err=True)
-            return
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
 
     try:
         if status:
-            selected: list[Task] = todo_list.select_by_status(status)
+            selected: tuple[Task, ...] = todo_list.select_by_status(status)
             filter_name: str = f"статусу '{status}'"
         else:
             selected = todo_list.select_by_priority(priority or "low")
@@ -94,11 +129,12 @@ def select(status: str | None, priority: str | None) -> None:
 
         if selected:
             click.echo(f"Найдено задач по {filter_name}: {len(selected)}\n")
-            for idx, task_item in enumerate(selected, 1):
+            for task_item in selected:
                 status_str: str = str(task_item.status)
                 priority_str: str = str(task_item.priority)
                 click.echo(
-                    f"{idx}. {task_item.text} " f"[{priority_str}, {status_str}]"
+                    f"{task_item.id}. {task_item.text} "
+                    f"[{priority_str}, {status_str}]"
                 )
         else:
             click.echo(f"Задачи не найдены по {filter_name}.")
@@ -107,49 +143,166 @@ def select(status: str | None, priority: str | None) -> None:
 
 
 @cli.command()
-def sort() -> None:
-    todo_list: TodoList = TodoList()
-    if os.path.exists("tasks.xml"):
-        try:
-            todo_list.load("tasks.xml")
-        except Exception as e:
-            click.echo(f"Ошибка при загрузке: {e}", err=True)
-            return
+@click.option("-k", "count", type=int, default=10, help="Количество задач")
+@click.option(
+    "--by",
+    type=click.Choice(list(SORT_KEYS)),
+    multiple=True,
+    default=["priority", "status"],
+    help="Поле упорядочивания (можно указать несколько раз)",
+)
+@click.option(
+    "--status",
+    type=click.Choice(["new", "in_progress", "completed"]),
+    help="Фильтр по статусу",
+)
+@click.pass_obj
+def top(session: Session, count: int, by: tuple[str, ...], status: str | None) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
+
+    st: Status | None = Status[status.upper()] if status else None
+
+    try:
+        selected: list[Task] = todo_list.top(
+            count, by, where=(lambda task: task.status == st) if st else None
+        )
+    except ValueError as e:
+        click.echo(f"Ошибка: {e}", err=True)
+        return
+
+    for task_item in selected:
+        status_str: str = str(task_item.status)
+        priority_str: str = str(task_item.priority)
+        click.echo(f"{task_item.id}. {task_item.text} [{priority_str}, {status_str}]")
+
+
+@cli.command()
+@click.argument("query")
+@click.pass_obj
+def search(session: Session, query: str) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
+
+    found: tuple[Task, ...] = todo_list.search(query)
+    if found:
+        click.echo(f"Найдено задач по запросу '{query}': {len(found)}\n")
+        for task_item in found:
+            status_str: str = str(task_item.status)
+            priority_str: str = str(task_item.priority)
+            click.echo(
+                f"{task_item.id}. {task_item.text} [{priority_str}, {status_str}]"
+            )
+    else:
+        click.echo(f"Задачи не найдены по запросу '{query}'.")
+
+
+@cli.command()
+@click.option("--json", "as_json", is_flag=True, help="Вывод в JSON")
+@click.pass_obj
+def stats(session: Session, as_json: bool) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
+
+    if as_json:
+        click.echo(json.dumps(todo_list.stats(), ensure_ascii=False, indent=2))
+    else:
+        click.echo(format_stats(todo_list.stats()))
+
+
+@cli.command()
+@click.pass_obj
+def sort(session: Session) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
 
     try:
         todo_list.sort_by_priority()
-        todo_list.save("tasks.xml")
+        session.changed = True
         click.echo("Задачи отсортированы по приоритету.")
         click.echo(todo_list)
     except Exception as e:
         click.echo(f"Ошибка: {e}", err=True)
 
 
+@cli.command()
+@click.argument("task_id", type=int)
+@click.argument("status", type=click.Choice(["new", "in_progress", "completed"]))
+@click.pass_obj
+def update(session: Session, task_id: int, status: str) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
+
+    try:
+        task_item: Task = todo_list.update_status(task_id, status)
+        session.changed = True
+        click.echo(f"Задача {task_id}: статус изменён на '{task_item.status}'.")
+    except ValueError as e:
+        click.echo(f"Ошибка: {e}", err=True)
+
+
+@cli.command()
+@click.argument("task_id", type=int)
+@click.pass_obj
+def delete(session: Session, task_id: int) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
+
+    try:
+        todo_list.delete(task_id)
+        session.changed = True
+        click.echo(f"Задача {task_id} удалена.")
+    except ValueError as e:
+        click.echo(f"Ошибка: {e}", err=True)
+
+
 @cli.command()
 @click.argument("filename")
-def load(filename: str) -> None:
+@click.option(
+    "--format", "fmt", type=click.Choice(FORMATS), default="xml", help="Формат файла"
+)
+@click.pass_obj
+def load(session: Session, filename: str, fmt: str) -> None:
     todo_list: TodoList = TodoList()
     try:
-        todo_list.load(filename)
-        click.echo(f"Данные загружены из {filename}")
+        if filename == "-":
+            todo_list.read(sys.stdin, fmt)
+        else:
+            todo_list.load(filename, fmt)
+        click.echo(f"Данные загружены из {filename}", err=filename == "-")
     except Exception as e:
         click.echo(f"Ошибка: {e}", err=True)
+        return
+
+    flush(session)
+    session.filename = None if filename == "-" else filename
+    session.fmt = fmt
+    session.todo_list = todo_list
 
 
 @cli.command()
 @click.argument("filename")
-def save(filename: str) -> None:
-    todo_list: TodoList = TodoList()
-    if os.path.exists("tasks.xml"):
-        try:
-            todo_list.load("tasks.xml")
-        except Exception as e:
-            click.echo(f"Ошибка при загрузке: {e}", err=True)
-            return
+@click.option(
+    "--format", "fmt", type=click.Choice(FORMATS), default="xml", help="Формат файла"
+)
+@click.pass_obj
+def save(session: Session, filename: str, fmt: str) -> None:
+    todo_list: TodoList | None = get_todo_list(session)
+    if todo_list is None:
+        return
 
     try:
-        todo_list.save(filename)
-        click.echo(f"Данные сохранены в {filename}")
+        if filename == "-":
+            todo_list.write(sys.stdout, fmt)
+        else:
+            todo_list.save(filename, fmt)
+        click.echo(f"Данные сохранены в {filename}", err=filename == "-")
     except Exception as e:
         click.echo(f"Ошибка: {e}", err=True)
 
@@ -2,9 +2,42 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
+import csv
+import heapq
+import json
+import os
+import re
+import tempfile
+import threading
+import weakref
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass, field
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from itertools import accumulate, batched, chain, count, islice
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TextIO,
+    cast,
+    overload,
+)
+
+from stores import FORMATS, open_store
+
+TOKEN_RE: re.Pattern[str] = re.compile(r"\w+")
+TASK_FIELDS: tuple[str, ...] = ("id", "text", "priority", "status")
 
 
 class Priority(Enum):
@@ -30,75 +63,161 @@ class Task:
     text: str
     priority: Priority
     status: Status
+    id: int = field(default=0, compare=False)
 
 
-@dataclass
-class TodoList:
-    tasks: list[Task] = field(default_factory=list)
+STATUS_ORDER: dict[Status, int] = {st: idx for idx, st in enumerate(Status)}
+PRIORITY_ORDER: dict[Priority, int] = {pri: idx for idx, pri in enumerate(Priority)}
 
-    def add(self, text: str, priority: str, status: str = "новая") -> None:
-        try:
-            pri: Priority = Priority[priority.upper()]
-        except KeyError:
-            raise ValueError(f"Invalid priority: {priority}")
+# Files written by dump_tasks carry these attributes on <tasks> and use
+# canonical enum names, so load can decode them without re-validating.
+# next_id keeps ids of deleted tasks from being handed out again.
+STORE_FORMAT: str = "todolist"
+STORE_VERSION: str = "1"
+STORE_ROOT_RE: re.Pattern[str] = re.compile(r"<tasks\b[^>]*>")
+NEXT_ID_RE: re.Pattern[str] = re.compile(r'\bnext_id="(\d+)"')
+XML_CHUNK: int = 64 * 1024
+PRIORITY_NAMES: dict[str, Priority] = {pri.name: pri for pri in Priority}
+STATUS_NAMES: dict[str, Status] = {st.name: st for st in Status}
 
-        try:
-            st: Status = Status[status.upper().replace(" ", "_")]
-        except KeyError:
-            raise ValueError(f"Invalid status: {status}")
+# Parsed tasks are cached next to the store in a binary columnar file; the
+# cache is used only while the store's path, size, mtime and inode match.
+CACHE_SUFFIX: str = ".cache"
+CACHE_MAGIC: bytes = b"todolist-cache 2\n"
 
-        self.tasks.append(Task(text=text, priority=pri, status=st))
+# TodoList keeps its tasks in blocks of this many slots; after snapshot() a
+# write copies only the block it touches.
+BLOCK_SIZE: int = 1024
 
-    def __str__(self) -> str:
-        if not self.tasks:
-            return "Список задач пуст."
-
-        table: list[str] = []
-        line: str = f"+-{'-' * 3}-+-{'-' * 40}-+-{'-' * 10}-+-{'-' * 12}-+"
-        table.append(line)
-        table.append(
-            f"| {'\u2116':^3} | {'\u0422\u0435\u043a\u0441\u0442':^40} | "
-            f"{'\u041f\u0440\u0438\u043e\u0440\u0438\u0442\u0435\u0442':^10} | "
-            f"{'\u0421\u0442\u0430\u0442\u0443\u0441':^12} |"
-        )
-        table.append(line)
+SORT_KEYS: dict[str, Callable[[Task], Any]] = {
+    "priority": lambda task: -task.priority.value,
+    "status": lambda task: STATUS_ORDER[task.status],
+    "text": lambda task: task.text.casefold(),
+}
 
-        for idx, task in enumerate(self.tasks, 1):
-            fmt_str: str = f"| {idx:>3} | {task.text:<40} | "
-            fmt_str += f"{str(task.priority):<10} | {str(task.status):<12} |"
-            table.append(fmt_str)
 
-        table.append(line)
-        return "\n".join(table)
+def parse_priority(priority: str) -> Priority:
+    try:
+        return Priority[priority.upper()]
+    except KeyError:
+        raise ValueError(f"Invalid priority: {priority}")
 
-    def select_by_status(self, status: str) -> list[Task]:
-        try:
-            st: Status = Status[status.upper().replace(" ", "_")]
-        except KeyError:
-            raise ValueError(f"Invalid status: {status}")
 
-        return [task for task in self.tasks if task.status == st]
+def parse_status(status: str) -> Status:
+    try:
+        return Status[status.upper().replace(" ", "_")]
+    except KeyError:
+        raise ValueError(f"Invalid status: {status}")
+
+
+def parse_id(task_id: str | None) -> int:
+    if not task_id:
+        return 0
+
+    try:
+        return int(task_id)
+    except ValueError:
+        raise ValueError(f"Invalid task id: {task_id}")
+
+
+def make_task(
+    text: str, priority: str, status: str = "новая", task_id: int = 0
+) -> Task:
+    return Task(
+        text=text,
+        priority=parse_priority(priority),
+        status=parse_status(status),
+        id=task_id,
+    )
+
+
+def task_record(task: Task) -> dict[str, Any]:
+    return {
+        "id": task.id,
+        "text": task.text,
+        "priority": task.priority.name,
+        "status": task.status.name,
+    }
+
+
+# Short CSV rows leave None in missing fields, and JSONL values may be of any
+# type, so the fields are checked before they reach parse_*.
+def task_from_record(record: dict[str, Any]) -> Task:
+    try:
+        text: Any = record["text"]
+        priority: Any = record["priority"]
+        status: Any = record["status"]
+        if not all(isinstance(value, str) for value in (text, priority, status)):
+            raise TypeError("task fields must be strings")
+        return make_task(text, priority, status, parse_id(str(record.get("id") or "")))
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid task record: {record}")
+
+
+# Yields the stored tasks and returns the stored next_id, or 0 when the
+# format has nowhere to keep it.
+def iter_tasks(fin: TextIO, fmt: str = "xml") -> Generator[Task, None, int]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format: {fmt}")
+
+    if fmt == "jsonl":
+        for line in fin:
+            if line.strip():
+                yield task_from_record(json.loads(line))
+        return 0
+
+    if fmt == "csv":
+        for row in csv.DictReader(fin):
+            yield task_from_record(row)
+        return 0
+
+    parser: ET.XMLPullParser = ET.XMLPullParser(events=("end",))
+    chunk: str = fin.read(XML_CHUNK)
+    trusted: bool = is_trusted_store(chunk)
+    next_id: int = store_next_id(chunk)
+    while chunk:
+        parser.feed(chunk)
+        yield from _parsed_tasks(parser, trusted)
+        chunk = fin.read(XML_CHUNK)
+
+    parser.close()
+    yield from _parsed_tasks(parser, trusted)
+    return next_id
+
 
-    def select_by_priority(self, priority: str) -> list[Task]:
+def read_store(fin: TextIO, fmt: str = "xml") -> tuple[list[Task], int]:
+    tasks: list[Task] = []
+    reader: Generator[Task, None, int] = iter_tasks(fin, fmt)
+    while True:
         try:
-            pri: Priority = Priority[priority.upper()]
-        except KeyError:
-            raise ValueError(f"Invalid priority: {priority}")
+            tasks.append(next(reader))
+        except StopIteration as stop:
+            return tasks, stop.value
 
-        return [task for task in self.tasks if task.priority == pri]
 
-    def sort_by_priority(self) -> None:
-        self.tasks.sort(key=lambda task: task.priority.value, reverse=True)
+def is_trusted_store(head: str) -> bool:
+    match: re.Match[str] | None = STORE_ROOT_RE.search(head)
+    if match is None:
+        return False
+
+    root: str = match.group(0)
+    return f'format="{STORE_FORMAT}"' in root and f'version="{STORE_VERSION}"' in root
+
 
-    def load(self, filename: str) -> None:
-        with open(filename, "r", encoding="utf-8") as fin:
-            xml: str = fin.read()
+def store_next_id(head: str) -> int:
+    root: re.Match[str] | None = STORE_ROOT_RE.search(head)
+    match: re.Match[str] | None = NEXT_ID_RE.search(root.group(0)) if root else None
+    return int(match.group(1)) if match else 0
 
-        parser: ET.XMLParser = ET.XMLParser(encoding="utf-8")
-        tree: ET.Element = ET.fromstring(xml, parser=parser)
 
-        self.tasks = []
-        for task_element in tree:
+def _parsed_tasks(parser: ET.XMLPullParser, trusted: bool) -> Iterator[Task]:
+    for event in parser.read_events():
+        task_element: object = event[-1]
+        if not isinstance(task_element, ET.Element) or task_element.tag != "task":
+            continue
+
+        task: Task | None = _trusted_task(task_element) if trusted else None
+        if task is None:
             text: str | None = None
             priority: str | None = None
             status: str | None = None
@@ -112,28 +231,918 @@ class TodoList:
                     status = element.text
 
             if text and priority and status:
-                self.add(text, priority, status)
+                task = make_task(
+                    text, priority, status, parse_id(task_element.get("id"))
+                )
+
+        if task is not None:
+            yield task
+        task_element.clear()
+
+
+def _trusted_task(task_element: ET.Element) -> Task | None:
+    if len(task_element) != 3:
+        return None
+
+    text_element, priority_element, status_element = task_element
+    if (text_element.tag, priority_element.tag, status_element.tag) != TASK_FIELDS[1:]:
+        return None
+
+    pri: Priority | None = PRIORITY_NAMES.get(priority_element.text or "")
+    st: Status | None = STATUS_NAMES.get(status_element.text or "")
+    if pri is None or st is None or not text_element.text:
+        return None
+    return Task(
+        text=text_element.text,
+        priority=pri,
+        status=st,
+        id=parse_id(task_element.get("id")),
+    )
+
+
+def dump_tasks(
+    tasks: Iterable[Task], fout: TextIO, fmt: str = "xml", next_id: int = 0
+) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format: {fmt}")
+
+    if fmt == "jsonl":
+        for task in tasks:
+            fout.write(json.dumps(task_record(task), ensure_ascii=False) + "\n")
+        return
+
+    if fmt == "csv":
+        writer: csv.DictWriter = csv.DictWriter(fout, fieldnames=TASK_FIELDS)
+        writer.writeheader()
+        for task in tasks:
+            writer.writerow(task_record(task))
+        return
+
+    root: ET.Element = ET.Element("tasks", format=STORE_FORMAT, version=STORE_VERSION)
+    if next_id:
+        root.set("next_id", str(next_id))
+
+    for task in tasks:
+        task_element: ET.Element = ET.Element("task", id=str(task.id))
+
+        text_element: ET.Element = ET.SubElement(task_element, "text")
+        text_element.text = task.text
+
+        priority_element: ET.Element = ET.SubElement(task_element, "priority")
+        priority_element.text = task.priority.name
+
+        status_element: ET.Element = ET.SubElement(task_element, "status")
+        status_element.text = task.status.name
+
+        root.append(task_element)
+
+    tree: ET.ElementTree = ET.ElementTree(root)
+    fout.write("<?xml version='1.0' encoding='utf-8'?>\n")
+    tree.write(fout, encoding="unicode")
+
+
+def read_tasks(filename: str, fmt: str = "xml") -> tuple[list[Task], int]:
+    with open_store(filename) as fin:
+        return read_store(fin, fmt)
+
+
+def write_tasks(
+    tasks: Iterable[Task], filename: str, fmt: str = "xml", next_id: int = 0
+) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format: {fmt}")
+
+    with open_store(filename, "w") as fout:
+        dump_tasks(tasks, fout, fmt, next_id)
+
+
+def store_key(filename: str, fmt: str = "xml") -> dict[str, Any]:
+    stat: os.stat_result = os.stat(filename)
+    return {
+        "path": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "inode": stat.st_ino,
+        "format": fmt,
+    }
+
+
+def read_cache(filename: str, key: dict[str, Any]) -> tuple[list[Task], int] | None:
+    try:
+        with open(filename + CACHE_SUFFIX, "rb") as fin:
+            if fin.readline() != CACHE_MAGIC:
+                return None
+            header: dict[str, Any] = json.loads(fin.readline())
+            if header["key"] != key:
+                return None
+
+            count: int = header["count"]
+            ids: array = array("q")
+            ids.frombytes(fin.read(count * ids.itemsize))
+            priorities: bytes = fin.read(count)
+            statuses: bytes = fin.read(count)
+            offsets: array = array("q")
+            offsets.frombytes(fin.read((count + 1) * offsets.itemsize))
+            text: str = fin.read().decode()
+
+        lengths: set[int] = {len(ids), len(priorities), len(statuses), len(offsets) - 1}
+        if lengths != {count} or offsets[-1] != len(text):
+            return None
+
+        pri_list: list[Priority] = list(Priority)
+        st_list: list[Status] = list(Status)
+        tasks: list[Task] = [
+            Task(text[begin:end], pri_list[pri], st_list[st], task_id)
+            for task_id, pri, st, begin, end in zip(
+                ids, priorities, statuses, offsets, offsets[1:]
+            )
+        ]
+        return tasks, int(header["next_id"])
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def write_cache(
+    tasks: Sequence[Task], filename: str, key: dict[str, Any], next_id: int = 0
+) -> None:
+    texts: list[str] = [task.text for task in tasks]
+    header: dict[str, Any] = {"key": key, "count": len(tasks), "next_id": next_id}
+    cache: str = filename + CACHE_SUFFIX
+
+    try:
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(cache) or ".", prefix=os.path.basename(cache)
+        )
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            os.fchmod(fout.fileno(), os.stat(filename).st_mode & 0o777)
+            fout.write(CACHE_MAGIC)
+            fout.write(json.dumps(header).encode() + b"\n")
+            fout.write(array("q", (task.id for task in tasks)).tobytes())
+            fout.write(bytes(PRIORITY_ORDER[task.priority] for task in tasks))
+            fout.write(bytes(STATUS_ORDER[task.status] for task in tasks))
+            fout.write(array("q", accumulate(map(len, texts), initial=0)).tobytes())
+            fout.write("".join(texts).encode())
+        os.replace(tmp, cache)
+    except OSError:
+        with suppress(OSError):
+            os.remove(tmp)
+
+
+def load_tasks(
+    filename: str, fmt: str = "xml", cache: bool = True
+) -> tuple[list[Task], int]:
+    if not cache:
+        return read_tasks(filename, fmt)
+
+    key: dict[str, Any] = store_key(filename, fmt)
+    cached: tuple[list[Task], int] | None = read_cache(filename, key)
+    if cached is not None:
+        return cached
+
+    # Only a cache that already exists is refreshed: reading a store must not
+    # leave a new file next to it.
+    tasks, next_id = read_tasks(filename, fmt)
+    if os.path.exists(filename + CACHE_SUFFIX):
+        write_cache(tasks, filename, key, next_id)
+    return tasks, next_id
+
+
+def save_tasks(
+    tasks: Sequence[Task],
+    filename: str,
+    fmt: str = "xml",
+    cache: bool = True,
+    next_id: int = 0,
+) -> None:
+    write_tasks(tasks, filename, fmt, next_id)
+    if cache:
+        write_cache(tasks, filename, store_key(filename, fmt), next_id)
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.casefold().replace("ё", "е"))
+
+
+# A term matches a task when it starts one of the task's tokens; a substring
+# check on the folded text rules out most tasks before they are tokenized.
+def match_task(task: Task, terms: Sequence[str]) -> bool:
+    text: str = task.text.casefold().replace("ё", "е")
+    if not all(term in text for term in terms):
+        return False
+
+    tokens: list[str] = TOKEN_RE.findall(text)
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+def render_tasks(tasks: Sequence[Task]) -> str:
+    if not tasks:
+        return "Список задач пуст."
+
+    table: list[str] = []
+    line: str = f"+-{'-' * 3}-+-{'-' * 40}-+-{'-' * 10}-+-{'-' * 12}-+"
+    table.append(line)
+    table.append(
+        f"| {'\u2116':^3} | {'\u0422\u0435\u043a\u0441\u0442':^40} | "
+        f"{'\u041f\u0440\u0438\u043e\u0440\u0438\u0442\u0435\u0442':^10} | "
+        f"{'\u0421\u0442\u0430\u0442\u0443\u0441':^12} |"
+    )
+    table.append(line)
+
+    for task in tasks:
+        fmt_str: str = f"| {task.id:>3} | {task.text:<40} | "
+        fmt_str += f"{str(task.priority):<10} | {str(task.status):<12} |"
+        table.append(fmt_str)
+
+    table.append(line)
+    return "\n".join(table)
+
+
+def top_tasks(
+    tasks: Iterable[Task],
+    k: int,
+    by: Iterable[str] = ("priority", "status"),
+    where: Callable[[Task], bool] | None = None,
+) -> list[Task]:
+    keys: list[Callable[[Task], Any]] = []
+    for name in by:
+        try:
+            keys.append(SORT_KEYS[name])
+        except KeyError:
+            raise ValueError(f"Invalid sort key: {name}")
+
+    if where is not None:
+        tasks = filter(where, tasks)
+
+    return heapq.nsmallest(k, tasks, key=lambda task: [fn(task) for fn in keys])
+
+
+def build_stats(counts: Mapping[tuple[Priority, Status], int]) -> dict:
+    matrix: dict[str, dict[str, int]] = {
+        pri.name: {st.name: counts.get((pri, st), 0) for st in Status}
+        for pri in Priority
+    }
+
+    return {
+        "total": sum(counts.values()),
+        "by_status": {
+            st.name: sum(row[st.name] for row in matrix.values()) for st in Status
+        },
+        "by_priority": {name: sum(row.values()) for name, row in matrix.items()},
+        "matrix": matrix,
+    }
+
+
+def _iter_slots(blocks: list[list[Task | None]], size: int) -> Iterator[Task]:
+    return filter(None, islice(chain.from_iterable(blocks), size))
+
+
+# Positions only ever grow between rebuilds, so posting lists stay sorted and
+# a snapshot can share the index by ignoring positions past its own size.
+# New tokens never shift _tokens in place: add publishes a fresh sorted list,
+# so a search that has already read _tokens keeps walking the old one.
+class TokenIndex:
+    def __init__(self) -> None:
+        self._postings: dict[str, list[int]] = {}
+        self._tokens: list[str] = []
+
+    @classmethod
+    def build(cls, slots: Iterable[Task | None]) -> "TokenIndex":
+        index: TokenIndex = cls()
+        index.extend(
+            (pos, task.text) for pos, task in enumerate(slots) if task is not None
+        )
+        return index
+
+    # Positions must come after every position already indexed.
+    def extend(self, items: Iterable[tuple[int, str]]) -> None:
+        for pos, text in items:
+            for token in set(tokenize(text)):
+                positions: list[int] | None = self._postings.get(token)
+                if positions is None:
+                    self._postings[token] = [pos]
+                else:
+                    positions.append(pos)
+
+        self._tokens = sorted(self._postings)
+
+    def add(self, pos: int, text: str) -> None:
+        tokens: list[str] | None = None
+        for token in set(tokenize(text)):
+            positions: list[int] | None = self._postings.get(token)
+            if positions is None:
+                self._postings[token] = [pos]
+                if tokens is None:
+                    tokens = list(self._tokens)
+                insort(tokens, token)
+            else:
+                positions.append(pos)
+
+        if tokens is not None:
+            self._tokens = tokens
+
+    def search(self, terms: Iterable[str], stop: int) -> list[int]:
+        found: set[int] | None = None
+        for term in terms:
+            matched: set[int] = self._match_prefix(term, stop)
+            found = matched if found is None else found & matched
+            if not found:
+                return []
+
+        return sorted(found or ())
+
+    def _match_prefix(self, prefix: str, stop: int) -> set[int]:
+        matched: set[int] = set()
+        tokens: list[str] = self._tokens
+        idx: int = bisect_left(tokens, prefix)
+        while idx < len(tokens) and tokens[idx].startswith(prefix):
+            positions: list[int] = self._postings[tokens[idx]]
+            matched.update(islice(positions, bisect_left(positions, stop)))
+            idx += 1
+        return matched
+
+
+class TodoListSnapshot(Sequence[Task]):
+    def __init__(
+        self,
+        blocks: list[list[Task | None]],
+        size: int,
+        length: int,
+        version: int,
+        counts: Mapping[tuple[Priority, Status], int],
+        next_id: int = 0,
+        index: TokenIndex | None = None,
+    ) -> None:
+        self._blocks: list[list[Task | None]] = blocks
+        self._size: int = size
+        self._length: int = length
+        self._version: int = version
+        self._counts: dict[tuple[Priority, Status], int] = dict(counts)
+        self._next_id: int = next_id
+        self._index: TokenIndex | None = index
+        self._dense: list[Task] | None = None
+        self._searched: bool = False
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, idx: int) -> Task: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[Task]: ...
+
+    def __getitem__(self, idx: int | slice) -> Task | list[Task]:
+        if isinstance(idx, slice):
+            return [self._task(pos) for pos in range(*idx.indices(self._length))]
+
+        pos: int = idx + self._length if idx < 0 else idx
+        if not 0 <= pos < self._length:
+            raise IndexError("snapshot index out of range")
+        return self._task(pos)
 
-    def save(self, filename: str) -> None:
-        root: ET.Element = ET.Element("tasks")
+    def _task(self, pos: int) -> Task:
+        if self._size == self._length:
+            return cast(Task, self._slot(pos))
 
-        for task in self.tasks:
-            task_element: ET.Element = ET.Element("task")
+        # Tombstones shift positions, so random access needs a dense copy.
+        if self._dense is None:
+            self._dense = list(self)
+        return self._dense[pos]
 
-            text_element: ET.Element = ET.SubElement(task_element, "text")
-            text_element.text = task.text
+    def _slot(self, pos: int) -> Task | None:
+        block, offset = divmod(pos, BLOCK_SIZE)
+        return self._blocks[block][offset]
 
-            priority_element: ET.Element = ET.SubElement(task_element, "priority")
-            priority_element.text = task.priority.name
+    def __iter__(self) -> Iterator[Task]:
+        return _iter_slots(self._blocks, self._size)
 
-            status_element: ET.Element = ET.SubElement(task_element, "status")
-            status_element.text = task.status.name
+    def __str__(self) -> str:
+        return render_tasks(self)
+
+    def select_by_status(self, status: str) -> tuple[Task, ...]:
+        st: Status = parse_status(status)
+        return tuple(task for task in self if task.status == st)
+
+    def select_by_priority(self, priority: str) -> tuple[Task, ...]:
+        pri: Priority = parse_priority(priority)
+        return tuple(task for task in self if task.priority == pri)
+
+    def search(self, query: str) -> tuple[Task, ...]:
+        terms: list[str] = tokenize(query)
+        if not terms:
+            return ()
+
+        if self._index is None:
+            if not self._searched:
+                self._searched = True
+                return tuple(task for task in self if match_task(task, terms))
+            self._index = TokenIndex.build(
+                islice(chain.from_iterable(self._blocks), self._size)
+            )
+        return tuple(
+            task
+            for pos in self._index.search(terms, self._size)
+            if (task := self._slot(pos)) is not None
+        )
+
+    def top(
+        self,
+        k: int,
+        by: Iterable[str] = ("priority", "status"),
+        where: Callable[[Task], bool] | None = None,
+    ) -> list[Task]:
+        return top_tasks(self, k, by, where)
+
+    def stats(self) -> dict:
+        return build_stats(self._counts)
+
+
+# TodoList.tasks: a live, read-only sequence of the tasks. Tasks only change
+# through add, update_status and delete, which keep the ids and indexes in
+# step, so list methods such as append are deliberately missing. Reads go
+# through a snapshot that is reused until the list changes.
+class TaskView(Sequence[Task]):
+    def __init__(self, todo_list: "TodoList") -> None:
+        self._todo_list: TodoList = todo_list
+        self._snapshot: TodoListSnapshot | None = None
+
+    def _current(self) -> TodoListSnapshot:
+        snapshot: TodoListSnapshot | None = self._snapshot
+        if snapshot is None or snapshot.version != self._todo_list._version:
+            snapshot = self._snapshot = self._todo_list.snapshot()
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    @overload
+    def __getitem__(self, idx: int) -> Task: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[Task]: ...
+
+    def __getitem__(self, idx: int | slice) -> Task | list[Task]:
+        return self._current()[idx]
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(self._current())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _ReaderState:
+    def __init__(self) -> None:
+        self.lock: threading.RLock = threading.RLock()
+        self.reads: int = 0
+        self.writing: bool = False
+
+
+# Every thread reads under its own lock, so readers never contend with each
+# other; a writer takes all of them. Reads are reentrant, which lets a
+# top(where=...) callback read the same list, but a thread that holds a read
+# lock must not write: that would deadlock against another such thread, so
+# it raises RuntimeError instead, as does a nested write.
+class RWLock:
+    def __init__(self) -> None:
+        self._writer: threading.Lock = threading.Lock()
+        self._registry: threading.Lock = threading.Lock()
+        self._states: weakref.WeakSet[_ReaderState] = weakref.WeakSet()
+        self._local: threading.local = threading.local()
+
+    def _state(self) -> _ReaderState:
+        state: _ReaderState | None = getattr(self._local, "state", None)
+        if state is None:
+            state = self._local.state = _ReaderState()
+            with self._registry:
+                self._states.add(state)
+        return state
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        state: _ReaderState = self._state()
+        with state.lock:
+            state.reads += 1
+            try:
+                yield
+            finally:
+                state.reads -= 1
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        state: _ReaderState = self._state()
+        if state.reads or state.writing:
+            raise RuntimeError("RWLock write lock requested while already held")
+
+        with self._writer, self._registry:
+            states: list[_ReaderState] = list(self._states)
+            for other in states:
+                other.lock.acquire()
+            state.writing = True
+            try:
+                yield
+            finally:
+                state.writing = False
+                for other in states:
+                    other.lock.release()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+@dataclass
+class TodoList:
+    CACHE_SIZE: ClassVar[int] = 128
+    STORE_CACHE: ClassVar[bool] = True
+
+    # Takes the initial tasks; after __post_init__ it is a read-only TaskView.
+    tasks: Sequence[Task] = ()
+    # Tasks live in blocks of BLOCK_SIZE slots. Deleted tasks leave a None
+    # tombstone in place, so positions of the other tasks stay valid;
+    # tombstones are dropped once they make up half the slots.
+    _blocks: list[list[Task | None]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _size: int = field(default=0, init=False, repr=False, compare=False)
+    _positions: dict[int, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _next_id: int = field(default=1, init=False, repr=False, compare=False)
+    _deleted: int = field(default=0, init=False, repr=False, compare=False)
+    _index: TokenIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _index_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    _counts: Counter[tuple[Priority, Status]] = field(
+        default_factory=Counter, init=False, repr=False, compare=False
+    )
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    # Bumped whenever tasks move to new positions, unlike _version.
+    _layout: int = field(default=0, init=False, repr=False, compare=False)
+    # Entries are [value, last use]; see _cached.
+    _cache: dict[tuple, list[Any]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _cache_version: int = field(default=0, init=False, repr=False, compare=False)
+    _ticks: Iterator[int] = field(
+        default_factory=count, init=False, repr=False, compare=False
+    )
+    _hits: dict[int, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _misses: int = field(default=0, init=False, repr=False, compare=False)
+    _lock: RWLock = field(default_factory=RWLock, init=False, repr=False, compare=False)
+    _cache_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    # Snapshots share _blocks: while _shared is set the outer list must be
+    # copied before a block is swapped, and blocks outside _owned must be
+    # copied before they are written to.
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)
+    _owned: set[int] = field(default_factory=set, init=False, repr=False, compare=False)
+    _searched: bool = field(default=False, init=False, repr=False, compare=False)
+    # Path of the store the list was loaded from; only it gets a store cache.
+    _store: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._reindex(list(self.tasks))
+        self.tasks = TaskView(self)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TodoList):
+            return NotImplemented
+        return self.tasks == other.tasks
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.tasks!r})"
+
+    def _count(self) -> int:
+        return self._size - self._deleted
+
+    def _reindex(self, tasks: list[Task]) -> None:
+        counts: Counter[tuple[Priority, Status]] = Counter()
+        ids: dict[int, int] = {}
+        max_id: int = max((task.id for task in tasks), default=0)
+        next_id: int = max(self._next_id, max_id + 1)
+        for pos, task in enumerate(tasks):
+            if task.id <= 0 or task.id in ids:
+                task = tasks[pos] = replace(task, id=next_id)
+                next_id += 1
+
+            ids[task.id] = pos
+            counts[task.priority, task.status] += 1
+
+        self._blocks = [list(batch) for batch in batched(tasks, BLOCK_SIZE)]
+        self._size = len(tasks)
+        self._owned = set(range(len(self._blocks)))
+        self._shared = False
+        self._deleted = 0
+        self._counts = counts
+        self._positions = ids
+        self._next_id = next_id
+        self._index = None
+        self._layout += 1
+
+    def _slot(self, pos: int) -> Task | None:
+        block, offset = divmod(pos, BLOCK_SIZE)
+        return self._blocks[block][offset]
+
+    def _set_slot(self, pos: int, task: Task | None) -> None:
+        block, offset = divmod(pos, BLOCK_SIZE)
+        if self._shared:
+            self._blocks = list(self._blocks)
+            self._shared = False
+        if block not in self._owned:
+            self._blocks[block] = list(self._blocks[block])
+            self._owned.add(block)
+        self._blocks[block][offset] = task
+
+    # Snapshots never look past their own size, so appending needs no copy.
+    def _append(self, task: Task) -> int:
+        pos: int = self._size
+        block, offset = divmod(pos, BLOCK_SIZE)
+        if offset:
+            self._blocks[block].append(task)
+        else:
+            self._blocks.append([task])
+            self._owned.add(block)
+        self._size += 1
+        return pos
+
+    # The token index is only needed by search, so it is built on first use;
+    # readers race to build it, hence the lock on top of the read lock.
+    def _build_index(self) -> TokenIndex:
+        index: TokenIndex | None = self._index
+        if index is not None:
+            return index
+
+        with self._index_lock:
+            if self._index is None:
+                self._index = TokenIndex.build(chain.from_iterable(self._blocks))
+            return self._index
+
+    def _index_task(self, pos: int, task: Task) -> None:
+        self._positions[task.id] = pos
+        self._counts[task.priority, task.status] += 1
+        if self._index is not None:
+            self._index.add(pos, task.text)
+
+    # The index keeps the position of a deleted task; search skips tombstones.
+    def _unindex_task(self, task: Task) -> None:
+        del self._positions[task.id]
+        self._counts[task.priority, task.status] -= 1
+
+    def _lookup(self, task_id: int) -> tuple[int, Task]:
+        pos: int | None = self._positions.get(task_id)
+        task: Task | None = None if pos is None else self._slot(pos)
+        if pos is None or task is None:
+            raise ValueError(f"Task not found: {task_id}")
+        return pos, task
+
+    def _compact(self) -> None:
+        self._reindex(list(self._live()))
 
-            root.append(task_element)
+    # Callers hold the read lock, so the version cannot change underneath and
+    # a hit needs no lock: it only stamps the entry and bumps this thread's
+    # own hit count. Misses take the cache lock to insert and evict the entry
+    # with the oldest stamp.
+    def _cached[T](self, key: tuple, compute: Callable[[], T]) -> T:
+        if self._cache_version == self._version:
+            entry: list[Any] | None = self._cache.get(key)
+            if entry is not None:
+                entry[1] = next(self._ticks)
+                thread: int = threading.get_ident()
+                self._hits[thread] = self._hits.get(thread, 0) + 1
+                return entry[0]
 
-        tree: ET.ElementTree = ET.ElementTree(root)
-        with open(filename, "wb") as fout:
-            tree.write(fout, encoding="utf-8", xml_declaration=True)
+        with self._cache_lock:
+            if self._cache_version != self._version:
+                self._cache = {}
+                self._cache_version = self._version
+            self._misses += 1
+
+        value: T = compute()
+        with self._cache_lock:
+            self._cache[key] = [value, next(self._ticks)]
+            if len(self._cache) > self.CACHE_SIZE:
+                del self._cache[min(self._cache, key=lambda k: self._cache[k][1])]
+
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        with self._cache_lock:
+            return CacheInfo(
+                sum(self._hits.copy().values()),
+                self._misses,
+                self.CACHE_SIZE,
+                len(self._cache),
+            )
+
+    def _replace(self, other: "TodoList") -> None:
+        with self._lock.write():
+            self._blocks = other._blocks
+            self._size = other._size
+            self._owned = other._owned
+            self._shared = False
+            self._index = other._index
+            self._counts = other._counts
+            self._positions = other._positions
+            self._next_id = other._next_id
+            self._deleted = other._deleted
+            self._layout += 1
+            self._version += 1
+
+    def add(self, text: str, priority: str, status: str = "новая") -> int:
+        task: Task = make_task(text, priority, status)
+        with self._lock.write():
+            task = replace(task, id=self._next_id)
+            self._next_id += 1
+            self._index_task(self._append(task), task)
+            self._version += 1
+        return task.id
+
+    def update_status(self, task_id: int, status: str) -> Task:
+        st: Status = parse_status(status)
+
+        with self._lock.write():
+            pos, old = self._lookup(task_id)
+            task: Task = replace(old, status=st)
+            self._set_slot(pos, task)
+            self._counts[old.priority, old.status] -= 1
+            self._counts[task.priority, task.status] += 1
+            self._version += 1
+        return task
+
+    def delete(self, task_id: int) -> Task:
+        with self._lock.write():
+            pos, task = self._lookup(task_id)
+            self._unindex_task(task)
+            self._set_slot(pos, None)
+            self._deleted += 1
+            if self._deleted * 2 > self._size:
+                self._compact()
+            self._version += 1
+        return task
+
+    def __str__(self) -> str:
+        with self._lock.read():
+            return self._cached(("str",), self._render)
+
+    def _render(self) -> str:
+        return render_tasks(list(self._live()))
+
+    def _live(self) -> Iterator[Task]:
+        return _iter_slots(self._blocks, self._size)
+
+    def select_by_status(self, status: str) -> tuple[Task, ...]:
+        st: Status = parse_status(status)
+
+        with self._lock.read():
+            return self._cached(("status", st), lambda: self._select_status(st))
+
+    def _select_status(self, st: Status) -> tuple[Task, ...]:
+        return tuple(task for task in self._live() if task.status == st)
+
+    def select_by_priority(self, priority: str) -> tuple[Task, ...]:
+        pri: Priority = parse_priority(priority)
+
+        with self._lock.read():
+            return self._cached(("priority", pri), lambda: self._select_priority(pri))
+
+    def _select_priority(self, pri: Priority) -> tuple[Task, ...]:
+        return tuple(task for task in self._live() if task.priority == pri)
+
+    def sort_by_priority(self) -> None:
+        with self._lock.write():
+            self._reindex(
+                sorted(self._live(), key=lambda task: task.priority.value, reverse=True)
+            )
+            self._version += 1
+
+    def top(
+        self,
+        k: int,
+        by: Iterable[str] = ("priority", "status"),
+        where: Callable[[Task], bool] | None = None,
+    ) -> list[Task]:
+        with self._lock.read():
+            return top_tasks(self._live(), k, by, where)
+
+    def search(self, query: str) -> tuple[Task, ...]:
+        terms: tuple[str, ...] = tuple(tokenize(query))
+        if not terms:
+            return ()
+
+        with self._lock.read():
+            return self._cached(("search", terms), lambda: self._search(terms))
+
+    # Building the index costs more than one scan, so a single query (the
+    # one-shot task_2.py search) scans and the index waits for the second.
+    def _search(self, terms: tuple[str, ...]) -> tuple[Task, ...]:
+        if self._index is None and not self._searched:
+            self._searched = True
+            return tuple(task for task in self._live() if match_task(task, terms))
+
+        return tuple(
+            task
+            for pos in self._build_index().search(terms, self._size)
+            if (task := self._slot(pos)) is not None
+        )
+
+    def stats(self) -> dict:
+        with self._lock.read():
+            return build_stats(self._counts)
+
+    def load(self, filename: str, fmt: str = "xml") -> None:
+        self._replace(self._restored(*load_tasks(filename, fmt, self.STORE_CACHE)))
+        self._store = os.path.abspath(filename)
+
+    @staticmethod
+    def _restored(tasks: list[Task], next_id: int) -> "TodoList":
+        todo_list: TodoList = TodoList(tasks)
+        todo_list._next_id = max(todo_list._next_id, next_id)
+        return todo_list
+
+    def save(self, filename: str, fmt: str = "xml") -> None:
+        snapshot: TodoListSnapshot = self.snapshot()
+        cache: bool = self.STORE_CACHE and self._store == os.path.abspath(filename)
+        save_tasks(snapshot, filename, fmt, cache, snapshot.next_id)
+
+    def read(self, fin: TextIO, fmt: str = "xml") -> None:
+        self._replace(self._restored(*read_store(fin, fmt)))
+        self._store = None
+
+    def write(self, fout: TextIO, fmt: str = "xml") -> None:
+        snapshot: TodoListSnapshot = self.snapshot()
+        dump_tasks(snapshot, fout, fmt, snapshot.next_id)
+
+    def snapshot(self) -> TodoListSnapshot:
+        with self._lock.read():
+            self._shared = True
+            self._owned = set()
+            return TodoListSnapshot(
+                self._blocks,
+                self._size,
+                self._count(),
+                self._version,
+                self._counts,
+                self._next_id,
+                self._index,
+            )
+
+    async def aload(self, filename: str, fmt: str = "xml") -> None:
+        await asyncio.to_thread(self.load, filename, fmt)
+
+    async def asave(self, filename: str, fmt: str = "xml") -> None:
+        await asyncio.to_thread(self.save, filename, fmt)
+
+
+def format_stats(stats: dict) -> str:
+    line: str = f"+-{'-' * 10}-+" + f"-{'-' * 12}-+" * (len(Status) + 1)
+    header: str = f"| {'Приоритет':^10} |"
+    for st in Status:
+        header += f" {str(st):^12} |"
+    header += f" {'Всего':^12} |"
+
+    table: list[str] = [line, header, line]
+    for pri in Priority:
+        row: str = f"| {str(pri):<10} |"
+        for st in Status:
+            row += f" {stats['matrix'][pri.name][st.name]:>12} |"
+        row += f" {stats['by_priority'][pri.name]:>12} |"
+        table.append(row)
+
+    table.append(line)
+    total: str = f"| {'Всего':<10} |"
+    for st in Status:
+        total += f" {stats['by_status'][st.name]:>12} |"
+    total += f" {stats['total']:>12} |"
+    table.append(total)
+    table.append(line)
+    return "\n".join(table)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -179,14 +1188,61 @@ def build_parser() -> argparse.ArgumentParser:
 
     subparsers.add_parser("sort", help="Отсортировать по приоритету")
 
+    search_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "search", help="Найти задачи по тексту"
+    )
+    search_parser.add_argument("query", help="Слова или начала слов из текста задачи")
+
+    top_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "top", help="Показать первые N задач"
+    )
+    top_parser.add_argument("-k", type=int, default=10, help="Количество задач")
+    top_parser.add_argument(
+        "--by",
+        action="append",
+        choices=list(SORT_KEYS),
+        help="Поле упорядочивания (можно указать несколько раз)",
+    )
+    top_parser.add_argument(
+        "--status",
+        choices=["new", "in_progress", "completed"],
+        help="Фильтр по статусу",
+    )
+
+    stats_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "stats", help="Статистика по статусам и приоритетам"
+    )
+    stats_parser.add_argument("--json", action="store_true", help="Вывод в JSON")
+
+    update_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "update", help="Изменить статус задачи"
+    )
+    update_parser.add_argument("id", type=int, help="Номер задачи")
+    update_parser.add_argument(
+        "status",
+        choices=["new", "in_progress", "completed"],
+        help="Новый статус",
+    )
+
+    delete_parser: argparse.ArgumentParser = subparsers.add_parser(
+        "delete", help="Удалить задачу"
+    )
+    delete_parser.add_argument("id", type=int, help="Номер задачи")
+
     load_parser: argparse.ArgumentParser = subparsers.add_parser(
-        "load", help="Загрузить из XML"
+        "load", help="Загрузить из файла"
+    )
+    load_parser.add_argument("filename", help="Имя файла или - для stdin")
+    load_parser.add_argument(
+        "--format", choices=FORMATS, default="xml", help="Формат файла"
     )
-    load_parser.add_argument("filename", help="Имя XML файла")
 
     save_parser: argparse.ArgumentParser = subparsers.add_parser(
-        "save", help="Сохранить в XML"
+        "save", help="Сохранить в файл"
+    )
+    save_parser.add_argument("filename", help="Имя файла или - для stdout")
+    save_parser.add_argument(
+        "--format", choices=FORMATS, default="xml", help="Формат файла"
     )
-    save_parser.add_argument("filename", help="Имя XML файла")
 
     return parser
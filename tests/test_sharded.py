@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+import sharded as sharded_module
+from sharded import ShardedTodoList
+from todolist import TodoList, parse_status
+
+
+@pytest.fixture
+def tasks():
+    todo_list = TodoList()
+    for idx in range(50):
+        todo_list.add(
+            f"Задача {idx} купить ёлку" if idx % 7 == 0 else f"Задача {idx}",
+            ["low", "medium", "high"][idx % 3],
+            ["new", "in_progress", "completed"][idx % 4 % 3],
+        )
+    return todo_list
+
+
+class TestShardedTodoList:
+    def test_select_matches_todolist(self, tasks):
+        with ShardedTodoList(list(tasks.tasks), workers=3) as sharded:
+            for status in ("new", "in_progress", "completed"):
+                assert sharded.select_by_status(status) == tasks.select_by_status(
+                    status
+                )
+            for priority in ("low", "medium", "high"):
+                assert sharded.select_by_priority(priority) == tasks.select_by_priority(
+                    priority
+                )
+
+    def test_stats_and_search_match_todolist(self, tasks):
+        with ShardedTodoList(list(tasks.tasks), workers=4) as sharded:
+            assert sharded.stats() == tasks.stats()
+            assert sharded.search("елк куп") == tasks.search("елк куп")
+            assert sharded.search("задача 4") == tasks.search("задача 4")
+
+    def test_columns_follow_mutations(self, tasks):
+        with ShardedTodoList(workers=2) as sharded:
+            assert sharded.select_by_status("new") == ()
+            assert sharded.stats()["total"] == 0
+
+            sharded.add("Купить продукты", "low", "new")
+            sharded.add("Сделать уроки", "high", "new")
+            assert len(sharded.select_by_status("new")) == 2
+
+            sharded.sort_by_priority()
+            assert sharded.search("урок") == (sharded.tasks[0],)
+            assert sharded.stats()["by_priority"]["HIGH"] == 1
+
+    def test_columns_skip_deleted(self, tasks):
+        with ShardedTodoList(list(tasks.tasks), workers=3) as sharded:
+            for task_id in (1, 8, 15):
+                sharded.delete(task_id)
+                tasks.delete(task_id)
+            sharded.update_status(2, "completed")
+            tasks.update_status(2, "completed")
+
+            assert sharded.stats() == tasks.stats()
+            assert sharded.select_by_status("completed") == tasks.select_by_status(
+                "completed"
+            )
+            assert sharded.search("елк") == tasks.search("елк")
+
+    def test_stripes_match_todolist(self, tasks):
+        with ShardedTodoList(list(tasks.tasks), workers=3, stripe=4) as sharded:
+            assert sharded.search("елк") == tasks.search("елк")
+            assert [ranges[:2] for _, ranges in sharded._shards()] == [
+                [(0, 4), (12, 16)],
+                [(4, 8), (16, 20)],
+                [(8, 12), (20, 24)],
+            ]
+
+            for task_id in (3, 10):
+                sharded.delete(task_id)
+                tasks.delete(task_id)
+            for idx in range(10):
+                sharded.add(f"Купить ёлку {idx}", "high", "new")
+                tasks.add(f"Купить ёлку {idx}", "high", "new")
+
+            assert sharded.search("елк куп") == tasks.search("елк куп")
+            assert sharded.select_by_status("new") == tasks.select_by_status("new")
+            assert sharded.stats() == tasks.stats()
+
+    def test_mutations_update_columns_in_place(self, tasks):
+        with ShardedTodoList(list(tasks.tasks), workers=2, stripe=8) as sharded:
+            names = sharded._columns()
+
+            sharded.update_status(5, "completed")
+            sharded.delete(6)
+            assert sharded._columns() == names
+            assert sharded.select_by_status("completed") == tuple(
+                task for task in sharded.tasks if task.status.name == "COMPLETED"
+            )
+
+            sharded.add("Полить цветы", "low", "new")
+            assert sharded.search("цвет") == (sharded.tasks[-1],)
+
+            sharded.sort_by_priority()
+            assert sharded._columns() != names
+            assert sharded.search("цвет") == (sharded.tasks[-1],)
+
+    def test_worker_extends_shard_index(self, tasks):
+        with ShardedTodoList(list(tasks.tasks), workers=1) as sharded:
+            names = sharded._columns()
+            mask = sharded._segments["mask"].buf
+
+            assert sharded_module._search_shard(names, [(0, 20)], 1, ("елк",)) == [3]
+            assert [pos for pos in range(20) if mask[pos]] == [0, 7, 14]
+            index, done = sharded_module._indexes[1]
+            assert done == 20
+
+            ranges = [(0, 10), (10, 50)]
+            assert sharded_module._search_shard(names, ranges, 1, ("елк",)) == [2, 6]
+            assert [pos for pos in range(50) if mask[pos]] == [
+                0,
+                7,
+                14,
+                21,
+                28,
+                35,
+                42,
+                49,
+            ]
+            assert sharded_module._indexes[1] == (index, 50)
+
+            sharded_module._attach(())
+            sharded_module._indexes.clear()
+
+    def test_concurrent_queries(self, tasks):
+        expected = {
+            "new": tasks.select_by_status("new"),
+            "completed": tasks.select_by_status("completed"),
+        }
+        results = []
+
+        def query(status):
+            with sharded._lock.read():
+                for _ in range(10):
+                    results.append(
+                        sharded._select_status(parse_status(status)) == expected[status]
+                    )
+
+        with ShardedTodoList(list(tasks.tasks), workers=2, stripe=8) as sharded:
+            threads = [
+                threading.Thread(target=query, args=(status,))
+                for status in ("new", "completed") * 2
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert results == [True] * 40
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+from click.testing import CliRunner
+from task_2 import cli
+from todolist import TodoList
+
+
+@pytest.fixture
+def runner():
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        yield runner
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    load = TodoList.load
+    save = TodoList.save
+
+    def counted_load(self, filename, fmt="xml"):
+        calls.append(("load", filename))
+        load(self, filename, fmt)
+
+    def counted_save(self, filename, fmt="xml"):
+        calls.append(("save", filename))
+        save(self, filename, fmt)
+
+    monkeypatch.setattr(TodoList, "load", counted_load)
+    monkeypatch.setattr(TodoList, "save", counted_save)
+    return calls
+
+
+def invoke(runner, *args):
+    result = runner.invoke(cli, list(args), catch_exceptions=False)
+    assert result.exit_code == 0
+    return result.output
+
+
+class TestChain:
+    def test_store_is_loaded_and_saved_once(self, runner, calls):
+        invoke(runner, "add", "--text", "Старая задача", "--priority", "low")
+        calls.clear()
+
+        invoke(
+            runner,
+            "add", "--text", "Первая", "--priority", "high",
+            "add", "--text", "Вторая", "--priority", "medium",
+            "sort",
+            "save", "out.xml",
+        )  # fmt: skip
+
+        assert calls.count(("load", "tasks.xml")) == 1
+        assert calls.count(("save", "tasks.xml")) == 1
+        assert calls.count(("save", "out.xml")) == 1
+
+        loaded = TodoList()
+        loaded.load("out.xml")
+        assert [task.text for task in loaded.tasks] == [
+            "Первая",
+            "Вторая",
+            "Старая задача",
+        ]
+
+    def test_output_matches_separate_runs(self, runner):
+        steps = [
+            ["add", "--text", "Купить хлеб", "--priority", "low"],
+            ["add", "--text", "Позвонить", "--priority", "high"],
+            ["update", "1", "completed"],
+            ["search", "хлеб"],
+            ["list"],
+        ]
+        separate = "".join(invoke(runner, *step) for step in steps)
+        os.remove("tasks.xml")
+
+        chained = invoke(runner, *[arg for step in steps for arg in step])
+
+        assert chained == separate
+
+    def test_load_writes_back_to_loaded_file(self, runner, calls):
+        TodoList().save("x.xml")
+
+        invoke(runner, "load", "x.xml", "add", "--text", "Задача", "--priority", "low")
+
+        assert not os.path.exists("tasks.xml")
+        assert ("save", "x.xml") in calls
+        loaded = TodoList()
+        loaded.load("x.xml")
+        assert [task.text for task in loaded.tasks] == ["Задача"]
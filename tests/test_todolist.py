@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import io
 import os
 import tempfile
+import threading
 
 import pytest
+import todolist
 from todolist import Priority, Status, Task, TodoList
 
 
@@ -133,6 +137,506 @@ class TestTodoList:
         assert todo_list.tasks[1].priority == Priority.MEDIUM
         assert todo_list.tasks[2].priority == Priority.LOW
 
+    def test_top(self):
+        todo_list = TodoList()
+        todo_list.add("Task 1", "low", "new")
+        todo_list.add("Task 2", "high", "completed")
+        todo_list.add("Task 3", "high", "new")
+        todo_list.add("Task 4", "medium", "in_progress")
+        todo_list.add("Task 5", "high", "new")
+        before = list(todo_list.tasks)
+
+        top = todo_list.top(3)
+        assert [task.text for task in top] == ["Task 3", "Task 5", "Task 2"]
+        assert todo_list.tasks == before
+
+        open_tasks = todo_list.top(
+            2, where=lambda task: task.status != Status.COMPLETED
+        )
+        assert [task.text for task in open_tasks] == ["Task 3", "Task 5"]
+
+        by_status = todo_list.top(10, by=["status", "priority"])
+        assert [task.text for task in by_status][-1] == "Task 2"
+        assert todo_list.top(0) == []
+
+    def test_top_invalid_key(self):
+        todo_list = TodoList()
+        with pytest.raises(ValueError):
+            todo_list.top(1, by=["deadline"])
+
+    def test_search(self):
+        todo_list = TodoList()
+        todo_list.add("Купить продукты", "low", "new")
+        todo_list.add("Заплатить за квартиру", "high", "new")
+        todo_list.add("Купить ёлку", "medium", "new")
+
+        found = todo_list.search("КУПИТЬ")
+        assert [task.text for task in found] == ["Купить продукты", "Купить ёлку"]
+
+        assert todo_list.search("елк")[0].text == "Купить ёлку"
+        assert todo_list.search("куп прод")[0].text == "Купить продукты"
+        assert todo_list.search("молоко") == ()
+        assert todo_list.search("") == ()
+
+    def test_search_after_sort_and_load(self):
+        todo_list = TodoList()
+        todo_list.add("Write report", "low", "new")
+        todo_list.add("Review report", "high", "new")
+        todo_list.sort_by_priority()
+
+        assert [t.text for t in todo_list.search("rep")] == [
+            "Review report",
+            "Write report",
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            todo_list.save(filename)
+
+            loaded = TodoList()
+            loaded.add("Stale report", "low", "new")
+            loaded.load(filename)
+            assert len(loaded.search("report")) == 2
+            assert loaded.search("stale") == ()
+
+    def test_stats(self):
+        todo_list = TodoList()
+        todo_list.add("Task 1", "high", "new")
+        todo_list.add("Task 2", "high", "completed")
+        todo_list.add("Task 3", "low", "new")
+
+        stats = todo_list.stats()
+        assert stats["total"] == 3
+        assert stats["by_status"] == {"NEW": 2, "IN_PROGRESS": 0, "COMPLETED": 1}
+        assert stats["by_priority"] == {"LOW": 1, "MEDIUM": 0, "HIGH": 2}
+        assert stats["matrix"]["HIGH"]["COMPLETED"] == 1
+        assert stats["by_status"]["NEW"] == len(todo_list.select_by_status("new"))
+
+    def test_stats_empty(self):
+        stats = TodoList().stats()
+        assert stats["total"] == 0
+        assert sum(stats["by_status"].values()) == 0
+
+    def test_update_status(self):
+        todo_list = TodoList()
+        first = todo_list.add("Сделать уроки", "high", "new")
+        second = todo_list.add("Купить продукты", "low", "new")
+        assert first != second
+
+        todo_list.update_status(first, "in_progress")
+        task = todo_list.update_status(first, "completed")
+        assert task.status == Status.COMPLETED
+        assert task.id == first
+        assert todo_list.select_by_status("completed") == (task,)
+        assert todo_list.stats()["by_status"] == {
+            "NEW": 1,
+            "IN_PROGRESS": 0,
+            "COMPLETED": 1,
+        }
+
+        with pytest.raises(ValueError):
+            todo_list.update_status(first, "invalid")
+        with pytest.raises(ValueError):
+            todo_list.update_status(100, "new")
+
+    def test_delete(self):
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(4)]
+
+        deleted = todo_list.delete(ids[1])
+        assert deleted.text == "Task 1"
+        assert [task.text for task in todo_list.search("task")] == [
+            "Task 0",
+            "Task 2",
+            "Task 3",
+        ]
+        assert todo_list.stats()["total"] == 3
+        assert "Task 1" not in str(todo_list)
+        assert todo_list.top(5)[-1].text == "Task 3"
+
+        todo_list.update_status(ids[3], "completed")
+        todo_list.delete(ids[0])
+        todo_list.delete(ids[2])
+        assert [task.id for task in todo_list.tasks] == [ids[3]]
+        assert todo_list.select_by_status("completed")[0].id == ids[3]
+
+        with pytest.raises(ValueError):
+            todo_list.delete(ids[1])
+        assert todo_list.add("Task 4", "high", "new") not in ids
+
+    def test_tasks_hide_tombstones(self):
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(4)]
+        todo_list.delete(ids[1])
+
+        assert None not in todo_list.tasks
+        assert [task.id for task in todo_list.tasks] == [ids[0], ids[2], ids[3]]
+
+        with pytest.raises(AttributeError):
+            todo_list.tasks.clear()
+        assert len(todo_list.tasks) == 3
+        assert todo_list.tasks[1:] == todo_list.tasks[-2:]
+
+        compacted = TodoList(todo_list.tasks)
+        assert compacted == todo_list
+        assert "None" not in repr(todo_list)
+
+    def test_tasks_keyword_and_view(self):
+        todo_list = TodoList(tasks=[Task("A", Priority.LOW, Status.NEW)])
+        view = todo_list.tasks
+        assert view == [Task("A", Priority.LOW, Status.NEW)]
+
+        snapshot = view._current()
+        assert view[0] is view[-1]
+        assert view._current() is snapshot
+
+        todo_list.add("B", "high", "new")
+        assert todo_list.tasks is view
+        assert [task.text for task in view] == ["A", "B"]
+        assert view._current() is not snapshot
+
+    def test_init_copies_tasks(self):
+        tasks = [
+            Task("A", Priority.LOW, Status.NEW),
+            Task("B", Priority.LOW, Status.NEW),
+        ]
+        todo_list = TodoList(tasks)
+
+        assert [task.id for task in tasks] == [0, 0]
+        assert [task.id for task in todo_list.tasks] == [1, 2]
+        tasks.append(Task("C", Priority.LOW, Status.NEW))
+        assert len(todo_list.tasks) == 2
+
+    def test_delete_keeps_snapshot(self):
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(4)]
+
+        snapshot = todo_list.snapshot()
+        todo_list.delete(ids[0])
+        todo_list.update_status(ids[1], "completed")
+
+        assert [task.text for task in snapshot] == [f"Task {idx}" for idx in range(4)]
+        assert snapshot[1].status == Status.NEW
+        assert [task.id for task in todo_list.snapshot()] == ids[1:]
+
+    def test_ids_persist(self):
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(3)]
+        todo_list.delete(ids[0])
+        todo_list.sort_by_priority()
+
+        for fmt in ("xml", "jsonl", "csv"):
+            buffer = io.StringIO()
+            todo_list.write(buffer, fmt)
+            buffer.seek(0)
+
+            loaded = TodoList()
+            loaded.read(buffer, fmt)
+            assert [task.id for task in loaded.tasks] == ids[1:]
+            assert loaded.add("Task 3", "high", "new") == ids[-1] + 1
+
+        foreign = io.StringIO(
+            '<tasks><task id="7"><text>A</text><priority>low</priority>'
+            '<status>new</status></task><task id="7"><text>B</text>'
+            "<priority>low</priority><status>new</status></task>"
+            "<task><text>C</text><priority>low</priority>"
+            "<status>new</status></task></tasks>"
+        )
+        todo_list.read(foreign, "xml")
+        assert [task.id for task in todo_list.tasks] == [7, 8, 9]
+
+    def test_ids_are_not_reused(self):
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(3)]
+
+        todo_list.delete(ids[-1])
+        assert todo_list.add("Task 3", "high", "new") == ids[-1] + 1
+
+        todo_list.delete(ids[-1] + 1)
+        todo_list.delete(ids[1])
+        todo_list.sort_by_priority()
+        assert todo_list.add("Task 4", "high", "new") == ids[-1] + 2
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            todo_list.delete(ids[-1] + 2)
+            todo_list.save(filename)
+
+            for _ in range(2):
+                loaded = TodoList()
+                loaded.load(filename)
+                assert [task.id for task in loaded.tasks] == [ids[0]]
+                assert loaded.add("Task 5", "high", "new") == ids[-1] + 3
+
+    def test_query_cache(self):
+        todo_list = TodoList()
+        todo_list.add("Task 1", "high", "new")
+
+        first = todo_list.select_by_status("new")
+        assert todo_list.select_by_status("NEW") is first
+        assert todo_list.cache_info().hits == 1
+        assert todo_list.cache_info().misses == 1
+
+        todo_list.add("Task 2", "low", "new")
+        assert len(todo_list.select_by_status("new")) == 2
+        assert todo_list.cache_info().misses == 2
+
+        assert str(todo_list) is str(todo_list)
+        misses = todo_list.cache_info().misses
+        todo_list.sort_by_priority()
+        assert "Task 2" in str(todo_list)
+        assert todo_list.cache_info().misses == misses + 1
+
+    def test_cached_results_are_immutable(self):
+        todo_list = TodoList()
+        todo_list.add("Task 1", "high", "new")
+
+        found = todo_list.search("task")
+        assert isinstance(found, tuple)
+        assert isinstance(todo_list.select_by_status("new"), tuple)
+        assert isinstance(todo_list.select_by_priority("high"), tuple)
+        with pytest.raises(AttributeError):
+            found.clear()
+
+    def test_query_cache_eviction(self):
+        todo_list = TodoList()
+        todo_list.CACHE_SIZE = 2
+        todo_list.add("Task", "high", "new")
+
+        todo_list.select_by_status("new")
+        todo_list.select_by_priority("high")
+        todo_list.select_by_status("new")
+        todo_list.search("task")
+
+        info = todo_list.cache_info()
+        assert info.currsize == 2
+        todo_list.select_by_status("new")
+        assert todo_list.cache_info().hits == info.hits + 1
+        todo_list.select_by_priority("high")
+        assert todo_list.cache_info().misses == info.misses + 1
+
+    def test_concurrent_readers_and_writers(self):
+        todo_list = TodoList()
+        errors = []
+
+        def writer(offset):
+            for idx in range(200):
+                todo_list.add(f"Задача {offset + idx}", "low", "new")
+                if idx % 50 == 0:
+                    todo_list.sort_by_priority()
+
+        def reader():
+            try:
+                for _ in range(200):
+                    stats = todo_list.stats()
+                    assert stats["total"] == stats["by_status"]["NEW"]
+                    todo_list.select_by_status("new")
+                    todo_list.search("задача")
+                    todo_list.top(5)
+                    str(todo_list)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n * 1000,)) for n in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(todo_list.tasks) == 800
+        assert len(todo_list.search("задача")) == 800
+        assert todo_list.stats()["total"] == 800
+
+    def test_reentrant_read_with_waiting_writer(self):
+        todo_list = TodoList()
+        todo_list.add("Task", "low", "new")
+        reading = threading.Event()
+        writing = threading.Event()
+        found = []
+
+        def where(task):
+            reading.set()
+            writing.wait(5)
+            writer.join(0.1)
+            return todo_list.stats()["total"] == 1
+
+        def read():
+            found.extend(todo_list.top(1, where=where))
+
+        writer = threading.Thread(target=todo_list.add, args=("Task 2", "low", "new"))
+        reader = threading.Thread(target=read)
+        reader.start()
+        reading.wait(5)
+        writer.start()
+        writing.set()
+        reader.join(5)
+        writer.join(5)
+
+        assert not reader.is_alive() and not writer.is_alive()
+        assert [task.text for task in found] == ["Task"]
+        assert len(todo_list.tasks) == 2
+
+    def test_write_inside_read_raises(self):
+        todo_list = TodoList()
+        todo_list.add("Task", "low", "new")
+
+        with pytest.raises(RuntimeError):
+            todo_list.top(1, where=lambda task: todo_list.delete(task.id) is None)
+        assert len(todo_list.tasks) == 1
+        todo_list.add("Task 2", "low", "new")
+
+    def test_concurrent_cache_hits_are_counted(self):
+        todo_list = TodoList()
+        todo_list.add("Task", "low", "new")
+        todo_list.select_by_status("new")
+        barrier = threading.Barrier(4)
+
+        def reader():
+            barrier.wait()
+            for _ in range(500):
+                todo_list.select_by_status("new")
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert todo_list.cache_info().hits == 2000
+        assert todo_list.cache_info().misses == 1
+
+    def test_snapshot_is_stable(self):
+        todo_list = TodoList()
+        todo_list.add("Купить продукты", "low", "new")
+        todo_list.add("Сделать уроки", "high", "in_progress")
+
+        snapshot = todo_list.snapshot()
+        rendered = str(snapshot)
+        assert rendered == str(todo_list)
+
+        todo_list.add("Купить ёлку", "medium", "new")
+        todo_list.sort_by_priority()
+
+        assert len(snapshot) == 2
+        assert [task.text for task in snapshot] == ["Купить продукты", "Сделать уроки"]
+        assert snapshot[-1].text == "Сделать уроки"
+        assert snapshot[0:5] == list(snapshot)
+        assert str(snapshot) == rendered
+        assert snapshot.stats()["total"] == 2
+        assert [task.text for task in snapshot.search("куп")] == ["Купить продукты"]
+        assert snapshot.select_by_status("in_progress")[0].text == "Сделать уроки"
+        assert snapshot.top(1)[0].priority == Priority.HIGH
+        assert snapshot.version < todo_list.snapshot().version
+        with pytest.raises(IndexError):
+            snapshot[2]
+
+    def test_snapshot_shares_tasks(self):
+        todo_list = TodoList()
+        for idx in range(3):
+            todo_list.add(f"Task {idx}", "low", "new")
+
+        snapshot = todo_list.snapshot()
+        todo_list.add("Task 3", "high", "new")
+        assert snapshot[0] is todo_list.tasks[0]
+        assert len(snapshot) == 3
+
+    def test_snapshot_copies_only_touched_blocks(self, monkeypatch):
+        monkeypatch.setattr(todolist, "BLOCK_SIZE", 4)
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(10)]
+
+        snapshot = todo_list.snapshot()
+        todo_list.update_status(ids[5], "completed")
+        todo_list.update_status(ids[6], "completed")
+        todo_list.delete(ids[0])
+        todo_list.add("Task 10", "high", "new")
+
+        shared = [
+            block is todo_list._blocks[idx]
+            for idx, block in enumerate(snapshot._blocks)
+        ]
+        assert shared == [False, False, True]
+        assert [task.text for task in snapshot] == [f"Task {idx}" for idx in range(10)]
+        assert all(task.status == Status.NEW for task in snapshot)
+        assert todo_list.select_by_status("completed")[0].id == ids[5]
+        assert len(todo_list.tasks) == 10
+
+    def test_snapshot_with_tombstones(self, monkeypatch):
+        monkeypatch.setattr(todolist, "BLOCK_SIZE", 4)
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Task {idx}", "low", "new") for idx in range(6)]
+        todo_list.delete(ids[1])
+        version = todo_list.snapshot().version
+
+        snapshot = todo_list.snapshot()
+        assert snapshot.version == version
+        assert len(snapshot) == 5
+        assert snapshot[1].id == ids[2]
+        assert snapshot[-1].id == ids[5]
+        assert [task.id for task in snapshot[1:3]] == ids[2:4]
+
+    def test_snapshot_search_uses_index(self):
+        todo_list = TodoList()
+        ids = [todo_list.add(f"Отчёт {idx}", "low", "new") for idx in range(3)]
+        todo_list.search("отчет")
+        todo_list.search("отч")
+
+        snapshot = todo_list.snapshot()
+        todo_list.delete(ids[0])
+        todo_list.add("Отчёт 3", "high", "new")
+
+        assert snapshot._index is todo_list._index is not None
+        assert [task.id for task in snapshot.search("отч")] == ids
+        assert [task.id for task in todo_list.search("отч")] == ids[1:] + [ids[2] + 1]
+
+        fresh = TodoList()
+        fresh.add("Отчёт", "low", "new")
+        fresh_snapshot = fresh.snapshot()
+        fresh.add("Отчёт 2", "low", "new")
+        assert len(fresh_snapshot.search("отчет")) == 1
+
+    def test_first_search_scans(self):
+        todo_list = TodoList()
+        for text in ("Купить ёлку", "Купить продукты", "Сделать уроки", "Покупки"):
+            todo_list.add(text, "low", "new")
+
+        first = todo_list.search("куп ел")
+        assert todo_list._index is None
+        assert [task.text for task in first] == ["Купить ёлку"]
+        assert todo_list.search("куп ел") == first
+
+        assert todo_list.search("куп") == tuple(todo_list.tasks[:2])
+        assert todo_list._index is not None
+        assert todo_list.search("куп ел") == first
+        assert todo_list.search("упить") == ()
+
+    def test_snapshot_search_during_writes(self):
+        todo_list = TodoList()
+        for idx in range(2000):
+            todo_list.add(f"b{idx:05}", "low", "new")
+        todo_list.search("b")
+        todo_list.search("b0")
+        snapshot = todo_list.snapshot()
+        done = threading.Event()
+
+        def writer():
+            idx = 0
+            while not done.is_set():
+                todo_list.add(f"a{idx:05}", "low", "new")
+                idx += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            counts = {len(snapshot.search("b")) for _ in range(200)}
+        finally:
+            done.set()
+            thread.join()
+
+        assert counts == {2000}
+
     def test_str_representation(self):
         todo_list = TodoList()
         todo_list.add("Test task", "high", "new")
@@ -172,6 +676,270 @@ class TestTodoList:
             assert os.path.exists(filename)
             assert os.path.getsize(filename) > 0
 
+    def test_aload_and_asave(self):
+        async def roundtrip(tmpdir):
+            source = TodoList()
+            source.add("Купить продукты", "low", "new")
+            source.add("Сделать уроки", "medium", "in_progress")
+
+            filenames = [os.path.join(tmpdir, f"tasks_{i}.xml") for i in range(3)]
+            await asyncio.gather(*(source.asave(name) for name in filenames))
+
+            loaded = [TodoList() for _ in filenames]
+            await asyncio.gather(
+                *(todo.aload(name) for todo, name in zip(loaded, filenames))
+            )
+            return source, loaded
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source, loaded = asyncio.run(roundtrip(tmpdir))
+
+        for todo_list in loaded:
+            assert todo_list.tasks == source.tasks
+            assert todo_list.search("урок")[0].status == Status.IN_PROGRESS
+
+    @pytest.mark.parametrize("fmt", todolist.FORMATS)
+    def test_aload_and_asave_format(self, fmt):
+        async def roundtrip(filename):
+            source = TodoList()
+            source.add("Купить продукты", "low", "new")
+            await source.asave(filename, fmt)
+
+            loaded = TodoList()
+            await loaded.aload(filename, fmt)
+            return source, loaded
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source, loaded = asyncio.run(roundtrip(os.path.join(tmpdir, "tasks")))
+
+        assert loaded.tasks == source.tasks
+
+    def test_aload_does_not_block_event_loop(self):
+        held = threading.Event()
+        released = threading.Event()
+        todo_list = TodoList()
+
+        def hold():
+            with todo_list._lock.write():
+                held.set()
+                released.wait(5)
+
+        async def load(filename):
+            pending = asyncio.create_task(todo_list.aload(filename))
+            await asyncio.sleep(0.05)
+            blocked = not pending.done()
+            released.set()
+            await pending
+            return blocked
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            source = TodoList()
+            source.add("Task", "low", "new")
+            source.save(filename)
+
+            writer = threading.Thread(target=hold)
+            writer.start()
+            held.wait(5)
+            assert asyncio.run(load(filename))
+            writer.join()
+
+        assert todo_list.tasks == source.tasks
+
+    def test_load_invalid_keeps_tasks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            with open(filename, "w", encoding="utf-8") as fout:
+                fout.write(
+                    "<tasks><task><text>Task</text><priority>URGENT</priority>"
+                    "<status>NEW</status></task></tasks>"
+                )
+
+            todo_list = TodoList()
+            todo_list.add("Keep me", "low", "new")
+            with pytest.raises(ValueError):
+                todo_list.load(filename)
+            assert todo_list.tasks[0].text == "Keep me"
+
+    def test_xml_store_is_trusted(self, monkeypatch):
+        todo_list = TodoList()
+        todo_list.add("Сделать уроки", "medium", "in_progress")
+
+        buffer = io.StringIO()
+        todo_list.write(buffer, "xml")
+        assert 'format="todolist"' in buffer.getvalue()
+        assert 'version="1"' in buffer.getvalue()
+
+        def no_validation(*args):
+            raise AssertionError("trusted store went through make_task")
+
+        buffer.seek(0)
+        loaded = TodoList()
+        with monkeypatch.context() as patch:
+            patch.setattr(todolist, "make_task", no_validation)
+            loaded.read(buffer, "xml")
+        assert loaded.tasks == todo_list.tasks
+
+    def test_trusted_xml_checks_tags(self):
+        marked = io.StringIO(
+            '<tasks format="todolist" version="1"><task><note>junk</note>'
+            "<priority>LOW</priority><status>NEW</status></task>"
+            "<task><priority>LOW</priority><text>Task</text><status>NEW</status>"
+            "</task></tasks>"
+        )
+        todo_list = TodoList()
+        todo_list.read(marked, "xml")
+        assert todo_list.tasks == [Task("Task", Priority.LOW, Status.NEW)]
+
+    def test_read_foreign_xml_validates(self):
+        foreign = io.StringIO(
+            "<tasks><task><status>new</status><text>Task</text>"
+            "<priority>high</priority></task></tasks>"
+        )
+        todo_list = TodoList()
+        todo_list.read(foreign, "xml")
+        assert todo_list.tasks == [Task("Task", Priority.HIGH, Status.NEW)]
+
+        forged = io.StringIO(
+            '<tasks format="todolist" version="1"><task><text>Task</text>'
+            "<priority>high</priority><status>new</status></task></tasks>"
+        )
+        todo_list.read(forged, "xml")
+        assert todo_list.tasks == [Task("Task", Priority.HIGH, Status.NEW)]
+
+    @pytest.mark.parametrize("fmt", ["xml", "jsonl", "csv"])
+    def test_write_and_read_stream(self, fmt):
+        todo_list = TodoList()
+        todo_list.add('Купить "молоко", хлеб', "low", "new")
+        todo_list.add("Сделать уроки", "medium", "in_progress")
+
+        buffer = io.StringIO()
+        todo_list.write(buffer, fmt)
+        buffer.seek(0)
+
+        loaded = TodoList()
+        loaded.read(buffer, fmt)
+        assert loaded.tasks == todo_list.tasks
+
+    def test_save_and_load_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.jsonl")
+            todo_list = TodoList()
+            todo_list.add("Task 1", "high", "completed")
+            todo_list.save(filename, "jsonl")
+
+            with open(filename, encoding="utf-8") as fin:
+                assert fin.readline().startswith('{"id": 1, "text": "Task 1"')
+
+            loaded = TodoList()
+            loaded.load(filename, "jsonl")
+            assert loaded.tasks == todo_list.tasks
+
+    @pytest.mark.parametrize(
+        "suffix, magic",
+        [(".gz", b"\x1f\x8b"), (".bz2", b"BZh"), (".xz", b"\xfd7zXZ")],
+    )
+    def test_save_and_load_compressed(self, suffix, magic):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml" + suffix)
+            todo_list = TodoList()
+            todo_list.add("Заплатить за квартиру", "high", "new")
+            todo_list.add("Сделать уроки", "medium", "in_progress")
+            todo_list.save(filename)
+
+            with open(filename, "rb") as fin:
+                assert fin.read(len(magic)) == magic
+
+            loaded = TodoList()
+            loaded.load(filename)
+            assert loaded.tasks == todo_list.tasks
+
+    def test_load_uses_store_cache(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            todo_list = TodoList()
+            todo_list.add("Купить ёлку", "low", "new")
+            todo_list.add("Сделать уроки", "high", "completed")
+            todo_list.delete(1)
+            todo_list.save(filename)
+            todo_list.load(filename)
+            assert not os.path.exists(filename + ".cache")
+            todo_list.save(filename)
+            assert os.path.exists(filename + ".cache")
+
+            def no_parse(*args):
+                raise AssertionError("store parsed despite a valid cache")
+
+            with monkeypatch.context() as patch:
+                patch.setattr(todolist, "read_tasks", no_parse)
+                loaded = TodoList()
+                loaded.load(filename)
+            assert loaded.tasks == todo_list.tasks
+            assert [task.id for task in loaded.tasks] == [2]
+            assert loaded.search("урок")[0].status == Status.COMPLETED
+
+            other = TodoList()
+            other.add("Заплатить за квартиру", "medium", "in_progress")
+            with open(filename, "w", encoding="utf-8") as fout:
+                other.write(fout)
+            loaded.load(filename)
+            assert [task.text for task in loaded.tasks] == ["Заплатить за квартиру"]
+
+            with open(filename + ".cache", "r+b") as fout:
+                fout.truncate(40)
+            loaded.load(filename)
+            assert [task.text for task in loaded.tasks] == ["Заплатить за квартиру"]
+
+    def test_store_cache_only_for_loaded_store(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            todo_list = TodoList()
+            todo_list.add("Task", "low", "new")
+            todo_list.save(filename)
+            os.chmod(filename, 0o644)
+            todo_list.load(filename)
+            todo_list.save(filename)
+            todo_list.save(os.path.join(tmpdir, "out.xml"))
+            todo_list.save(os.path.join(tmpdir, "out.xml.gz"))
+            TodoList().load(os.path.join(tmpdir, "out.xml"))
+
+            assert sorted(os.listdir(tmpdir)) == [
+                "out.xml",
+                "out.xml.gz",
+                "tasks.xml",
+                "tasks.xml.cache",
+            ]
+            assert os.stat(filename + ".cache").st_mode & 0o777 == 0o644
+
+    def test_store_cache_disabled(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "tasks.xml")
+            todo_list = TodoList()
+            todo_list.STORE_CACHE = False
+            todo_list.add("Task", "low", "new")
+            todo_list.save(filename)
+            todo_list.load(filename)
+            assert os.listdir(tmpdir) == ["tasks.xml"]
+
+    def test_invalid_stream_format(self):
+        todo_list = TodoList()
+        with pytest.raises(ValueError):
+            todo_list.write(io.StringIO(), "yaml")
+        with pytest.raises(ValueError):
+            todo_list.read(io.StringIO('{"text": "Task"}\n'), "jsonl")
+
+    @pytest.mark.parametrize(
+        "data, fmt",
+        [
+            ("text,priority,status\nTask,low\n", "csv"),
+            ('{"text": "Task", "priority": 1, "status": "new"}\n', "jsonl"),
+            ('{"text": null, "priority": "low", "status": "new"}\n', "jsonl"),
+        ],
+    )
+    def test_invalid_record_fields(self, data, fmt):
+        with pytest.raises(ValueError, match="Invalid task record"):
+            TodoList().read(io.StringIO(data), fmt)
+
     def test_load_nonexistent_file(self):
         todo_list = TodoList()
         with pytest.raises(FileNotFoundError):
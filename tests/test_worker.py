@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import os
+import tempfile
+
+import pytest
+from worker import FORMATS, Staff, Worker, dump_workers, iter_workers, main
+
+
+@pytest.fixture
+def staff():
+    staff = Staff()
+    staff.add("Иванов И.И.", "Инженер", 2010)
+    staff.add("Петров П.П.", "Директор", 2001)
+    staff.add("Сидоров С.С.", "Бухгалтер", 2018)
+    return staff
+
+
+class TestWorkerStream:
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_round_trip(self, staff, fmt):
+        buf = io.StringIO()
+        dump_workers(staff.workers, buf, fmt)
+        buf.seek(0)
+
+        assert list(iter_workers(buf, fmt)) == staff.workers
+
+    def test_xml_encoding(self):
+        buf = io.StringIO()
+        dump_workers([Worker("Иванов И.И.", "Инженер", 2010)], buf)
+
+        assert buf.getvalue().startswith("<?xml version='1.0' encoding='utf-8'?>\n")
+        assert "<name>Иванов И.И.</name>" in buf.getvalue()
+        assert "<year>2010</year>" in buf.getvalue()
+
+    def test_jsonl_decoding(self):
+        buf = io.StringIO('{"name": "A", "post": "B", "year": "1999"}\n\n')
+
+        assert list(iter_workers(buf, "jsonl")) == [Worker("A", "B", 1999)]
+
+    def test_csv_decoding(self):
+        buf = io.StringIO("name,post,year\r\nA,B,1999\r\n")
+
+        assert list(iter_workers(buf, "csv")) == [Worker("A", "B", 1999)]
+
+    def test_xml_skips_incomplete_workers(self):
+        buf = io.StringIO(
+            "<workers><worker><name>A</name><post>B</post></worker>"
+            "<worker><name>C</name><post>D</post><year>2000</year></worker>"
+            "</workers>"
+        )
+
+        assert list(iter_workers(buf)) == [Worker("C", "D", 2000)]
+
+    def test_invalid_record(self):
+        buf = io.StringIO('{"name": "A", "post": "B", "year": "x"}\n')
+
+        with pytest.raises(ValueError):
+            list(iter_workers(buf, "jsonl"))
+
+    @pytest.mark.parametrize(
+        "data, fmt",
+        [
+            ("name,post,year\nA,B\n", "csv"),
+            ("name,post,year\nA\n", "csv"),
+            ('{"name": "A", "post": 1, "year": 2000}\n', "jsonl"),
+        ],
+    )
+    def test_invalid_record_fields(self, data, fmt):
+        with pytest.raises(ValueError, match="Invalid worker record"):
+            list(iter_workers(io.StringIO(data), fmt))
+
+    def test_invalid_format(self, staff):
+        with pytest.raises(ValueError):
+            list(iter_workers(io.StringIO(), "yaml"))
+        with pytest.raises(ValueError):
+            dump_workers(staff.workers, io.StringIO(), "yaml")
+
+
+class TestStaffStore:
+    @pytest.mark.parametrize("fmt", FORMATS)
+    @pytest.mark.parametrize("suffix", ["", ".gz", ".bz2", ".xz"])
+    def test_compressed_round_trip(self, staff, fmt, suffix):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, f"staff.{fmt}{suffix}")
+            staff.save(filename, fmt)
+
+            loaded = Staff()
+            loaded.load(filename, fmt)
+
+        assert loaded == staff
+
+    def test_compressed_file_is_compressed(self, staff):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "staff.xml.gz")
+            staff.save(filename)
+
+            with open(filename, "rb") as fin:
+                assert fin.read(2) == b"\x1f\x8b"
+
+    @pytest.mark.parametrize("fmt", FORMATS)
+    def test_stdio(self, staff, fmt, monkeypatch, capsys):
+        staff.save("-", fmt)
+        out = capsys.readouterr().out
+
+        monkeypatch.setattr("sys.stdin", io.StringIO(out))
+        loaded = Staff()
+        loaded.load("-", fmt)
+
+        assert loaded == staff
+
+
+class TestWorkerCli:
+    def test_pipe_through_stdio(self, monkeypatch, capsys, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        main(["add", "--name", "Иванов И.И.", "--post", "Инженер", "--year", "2010"])
+        capsys.readouterr()
+
+        main(["save", "-", "--format", "jsonl"])
+        out = capsys.readouterr().out
+        assert json.loads(out)["name"] == "Иванов И.И."
+
+        os.remove("staff.xml")
+        monkeypatch.setattr("sys.stdin", io.StringIO(out))
+        main(["load", "-", "--format", "jsonl"])
+        assert capsys.readouterr().out == ""
+
+        loaded = Staff()
+        loaded.load("staff.xml")
+        assert loaded.workers == [Worker("Иванов И.И.", "Инженер", 2010)]
+
+    def test_invalid_input_exits(self, monkeypatch, capsys, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.stdin", io.StringIO('{"name": "Иванов"}\n'))
+        with pytest.raises(SystemExit) as exc_info:
+            main(["load", "-", "--format", "jsonl"])
+
+        assert exc_info.value.code == 1
+        assert "Invalid worker record" in capsys.readouterr().err
+
+    def test_interactive_rejects_stdio(self, monkeypatch, capsys, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.stdin", io.StringIO("load\n-\njsonl\nlist\n"))
+        main([])
+
+        out = capsys.readouterr().out
+        assert "worker.py load -" in out
+        assert out.count("Введите команду") == 3